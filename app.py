@@ -1,13 +1,24 @@
 import streamlit as st
 import streamlit.components.v1 as components
-from streamlit_option_menu import option_menu
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import os
+import hashlib
 from dotenv import load_dotenv
 import json
+import ijson
+import orjson
 from datetime import datetime
+from itertools import islice
 import logging
-from typing import Dict, Any, Optional, List
-import pandas as pd
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Deque, Dict, Any, Iterator, Optional, List, Tuple
+from cachetools import LRUCache
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Import frontend components
 from frontend.components import (
@@ -18,7 +29,7 @@ from frontend.components import (
 from frontend.auth import authenticate_user, get_auth_status, require_auth, handle_auth_callback
 
 # Import backend modules
-from backend.models import SyncConfig, SyncResult, SyncDifference
+from backend.models import AnimeEntry, PlatformList, SyncConfig, SyncResult, SyncDifference
 from backend.anime_sync import AnimeSyncManager, SyncDirection
 from backend.api_clients import MALClient, AniListClient
 
@@ -32,6 +43,31 @@ load_dotenv()
 # API configuration
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 
+# Number of JSON entries submitted to the sync manager per batch; each batch ends with a wait for
+# its slowest write, so batches hold enough AniList mutations (25 entries each) to keep every writer busy
+JSON_IMPORT_BATCH_SIZE = 400
+# Uploads larger than this are streamed with ijson instead of parsed in one go
+JSON_STREAM_THRESHOLD_BYTES = 5 * 1024 * 1024
+# Maximum number of sync history entries kept per user
+SYNC_HISTORY_LIMIT = 200
+# Maximum number of users whose sync history is kept process-wide; the least recently used is dropped
+SYNC_HISTORY_USERS = 1_000
+# Seconds a fetched MAL/AniList list is reused across reruns before it is fetched again
+LIST_CACHE_TTL = 300
+
+# Sync direction options shown in the UI
+_DIRECTION_MAP = MappingProxyType({
+    "Bidirectional": SyncDirection.BIDIRECTIONAL,
+    "MAL to AniList": SyncDirection.MAL_TO_ANILIST,
+    "AniList to MAL": SyncDirection.ANILIST_TO_MAL
+})
+
+# Platform icons
+_ICONS = MappingProxyType({
+    "MyAnimeList": "📚",
+    "AniList": "📱"
+})
+
 # Initialize session state
 if "mal_access_token" not in st.session_state:
     st.session_state.mal_access_token = None
@@ -45,19 +81,16 @@ if "mal_username" not in st.session_state:
     st.session_state.mal_username = None
 if "anilist_username" not in st.session_state:
     st.session_state.anilist_username = None
-if 'sync_history' not in st.session_state:
-    st.session_state.sync_history = []
+if not isinstance(st.session_state.get('sync_history'), deque):
+    # Also upgrades sessions that still hold the old unbounded list
+    st.session_state.sync_history = deque(st.session_state.get('sync_history') or [], maxlen=SYNC_HISTORY_LIMIT)
 if 'last_sync_result' not in st.session_state:
     st.session_state.last_sync_result = None
-if "server_started" not in st.session_state:
-    st.session_state.server_started = False
 if "authenticated" not in st.session_state:
     st.session_state.authenticated = {"mal": False, "anilist": False}
 
-# No local FastAPI server needed when using public OAuth redirects
-st.session_state.server_started = False
-
-# Clients and sync_manager are created via cached factory below
+# The FastAPI backend is never started from this script; run it as its own process if needed
+# Clients and sync_manager are created lazily via the cached factories below
 
 # Configure page
 st.set_page_config(
@@ -68,7 +101,7 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling
-st.markdown("""
+_CSS = """
 <style>
     .stApp {
         max-width: 1200px;
@@ -119,7 +152,34 @@ st.markdown("""
         background-color: #f8f9fa;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Column order of the tuples produced by _diff_columns
+_DIFF_COLUMNS = ("Title", "Status", "Episodes", "Total", "Score")
+
+@st.cache_data(show_spinner=False)
+def _diff_df(columns: Tuple[Tuple[Any, ...], ...]) -> "pd.DataFrame":
+    """Build a differences table, cached on the column values so reruns reuse the frame."""
+    # Imported lazily so pages that never show a table don't pay for pandas
+    import pandas as pd
+    
+    df = pd.DataFrame(dict(zip(_DIFF_COLUMNS, columns)))
+    episodes = df["Episodes"].fillna(0).astype(int)
+    total = df["Total"].fillna(0).astype(int)
+    score = df["Score"].fillna(0).astype(int)
+    df["Progress"] = episodes.astype(str) + "/" + total.astype(str).where(total > 0, "?")
+    df["Score"] = score.astype(object).where(score > 0, "-")
+    return df[["Title", "Status", "Progress", "Score"]]
+
+def _diff_columns(items: List[AnimeEntry]) -> Tuple[Tuple[Any, ...], ...]:
+    """Split entries into hashable per-column tuples for _diff_df."""
+    return (
+        tuple(item.title for item in items),
+        tuple(item.status for item in items),
+        tuple(item.episodes_watched for item in items),
+        tuple(item.total_episodes for item in items),
+        tuple(item.score for item in items),
+    )
 
 def display_sync_result(result: SyncResult) -> None:
     """Display sync results in a user-friendly way."""
@@ -134,7 +194,7 @@ def display_sync_result(result: SyncResult) -> None:
     if result.error_count > 0:
         with st.expander(f"❌ {result.error_count} Errors (Click to view)"):
             for error in result.errors:
-                st.error(error)
+                st.error(f"Failed to sync '{error['title']}' to {error['platform']}: {error['error']}")
     
     # Show differences
     if result.differences:
@@ -146,44 +206,146 @@ def display_sync_result(result: SyncResult) -> None:
             with col1:
                 st.metric("Only in MAL", len(mal_only))
                 if mal_only:
-                    st.dataframe(pd.DataFrame([{
-                        "Title": item.title,
-                        "Status": item.status,
-                        "Progress": f"{item.episodes_watched or 0}/{item.total_episodes or '?'}",
-                        "Score": item.score or "-"
-                    } for item in mal_only]), use_container_width=True)
+                    st.dataframe(_diff_df(_diff_columns(mal_only)), use_container_width=True)
             
             with col2:
                 st.metric("Only in AniList", len(anilist_only))
                 if anilist_only:
-                    st.dataframe(pd.DataFrame([{
-                        "Title": item.title,
-                        "Status": item.status,
-                        "Progress": f"{item.episodes_watched or 0}/{item.total_episodes or '?'}",
-                        "Score": item.score or "-"
-                    } for item in anilist_only]), use_container_width=True)
+                    st.dataframe(_diff_df(_diff_columns(anilist_only)), use_container_width=True)
+            
+            # Entries on both lists whose status, progress or score were overwritten on one side
+            mal_updates = result.differences.get("mal_updates", [])
+            anilist_updates = result.differences.get("anilist_updates", [])
+            if mal_updates or anilist_updates:
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Updated on MAL", len(mal_updates))
+                    if mal_updates:
+                        st.dataframe(_diff_df(_diff_columns(mal_updates)), use_container_width=True)
+                with col2:
+                    st.metric("Updated on AniList", len(anilist_updates))
+                    if anilist_updates:
+                        st.dataframe(_diff_df(_diff_columns(anilist_updates)), use_container_width=True)
+
+@st.cache_data(show_spinner=False)
+def _parse_upload(raw: bytes) -> Any:
+    """Decode an uploaded JSON export, cached on the file bytes so reruns skip the parse."""
+    return orjson.loads(raw)
+
+@st.fragment
+def _result_view(result: SyncResult) -> None:
+    """Render a sync result as a fragment so its widgets rerun only this section."""
+    display_sync_result(result)
+
+def _iter_upload(uploaded_file) -> Iterator[Dict[str, Any]]:
+    """Stream entries out of a top-level JSON array without decoding the whole file."""
+    uploaded_file.seek(0)
+    return ijson.items(uploaded_file, "item", use_float=True)
+
+@st.cache_resource
+def _history_store() -> Tuple[threading.Lock, "LRUCache[str, Deque[Dict[str, Any]]]"]:
+    """Process-wide sync history keyed by user, shared across that user's sessions."""
+    return threading.Lock(), LRUCache(maxsize=SYNC_HISTORY_USERS)
+
+def get_sync_history() -> Deque[Dict[str, Any]]:
+    """Return the bounded sync history for the current user.
+    
+    Once both usernames are known the history is shared across the user's sessions,
+    so it survives reconnects; until then it lives in this session only.
+    """
+    mal_username = st.session_state.get("mal_username")
+    anilist_username = st.session_state.get("anilist_username")
+    if not (mal_username and anilist_username):
+        return st.session_state.sync_history
+    lock, store = _history_store()
+    with lock:
+        return store.setdefault(f"{mal_username}|{anilist_username}", deque(maxlen=SYNC_HISTORY_LIMIT))
+
+def _history_entry(result: SyncResult, direction: str, target_platform: str) -> Dict[str, Any]:
+    """Summarise a result for the history; the full result is kept only as last_sync_result."""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "sync_id": result.sync_id,
+        "direction": direction,
+        "target_platform": target_platform,
+        "success": result.success_count,
+        "errors": result.error_count,
+    }
+
+def _token_hash(token: Optional[str]) -> str:
+    """Digest an access token so it can key a cache without being stored in it."""
+    return hashlib.blake2b((token or "").encode("utf-8"), digest_size=8).hexdigest()
+
+@st.cache_data(ttl=LIST_CACHE_TTL, show_spinner=False)
+def _fetch_mal_list(username: Optional[str], token_hash: str, _manager: AnimeSyncManager) -> PlatformList:
+    """Fetch a MAL list, reusing it across reruns for the same user and token."""
+    return _manager.fetch_list("mal", username)
+
+@st.cache_data(ttl=LIST_CACHE_TTL, show_spinner=False)
+def _fetch_anilist_list(username: Optional[str], token_hash: str, _manager: AnimeSyncManager) -> PlatformList:
+    """Fetch an AniList list, reusing it across reruns for the same user and token."""
+    return _manager.fetch_list("anilist", username)
+
+def _cached_lists() -> Tuple[Optional[PlatformList], Optional[PlatformList]]:
+    """Return both lists for the signed-in user; a list that fails to load is None."""
+    mal_token = st.session_state.mal_access_token
+    anilist_token = st.session_state.anilist_access_token
+    manager = get_sync_manager(mal_token, anilist_token)
+    if not manager:
+        return None, None
+    ctx = get_script_run_ctx()
+    
+    def load(fetch, username: Optional[str], token: Optional[str]) -> Optional[PlatformList]:
+        # Worker threads need the script context to use the cache
+        add_script_run_ctx(threading.current_thread(), ctx)
+        try:
+            return fetch(username, _token_hash(token), manager)
+        except Exception as e:
+            logger.warning(f"Cached list fetch failed, sync will retry it: {str(e)}")
+            return None
+    
+    # A cache miss downloads both lists, so fetch them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        mal_future = executor.submit(load, _fetch_mal_list, st.session_state.mal_username, mal_token)
+        anilist_future = executor.submit(load, _fetch_anilist_list, st.session_state.anilist_username, anilist_token)
+    return mal_future.result(), anilist_future.result()
+
+def _invalidate_lists() -> None:
+    """Drop this user's cached lists after a sync or import has written to either platform.
+
+    Only the entries keyed by the current usernames and tokens are cleared; other users'
+    cached lists are untouched. _manager is excluded from the cache key, so None stands in for it.
+    """
+    _fetch_mal_list.clear(st.session_state.mal_username, _token_hash(st.session_state.mal_access_token), None)
+    _fetch_anilist_list.clear(st.session_state.anilist_username, _token_hash(st.session_state.anilist_access_token), None)
 
 def get_platform_icon(platform: str) -> str:
     """Get platform icon."""
-    icons = {
-        "MyAnimeList": "📚",
-        "AniList": "📱"
-    }
-    return icons.get(platform, "📋")
+    return _ICONS.get(platform, "📋")
 
 # Initialize API clients and sync manager
 @st.cache_resource
-def get_sync_manager(mal_token: Optional[str], anilist_token: Optional[str]):
+def get_clients(mal_token: Optional[str], anilist_token: Optional[str]) -> Tuple[Optional[MALClient], Optional[AniListClient]]:
+    """Build the API clients once per token pair so their HTTP sessions survive reruns."""
     mal_client = MALClient(mal_token) if mal_token else None
     anilist_client = AniListClient(anilist_token) if anilist_token else None
+    return mal_client, anilist_client
+
+@st.cache_resource
+def get_sync_manager(mal_token: Optional[str], anilist_token: Optional[str]) -> Optional[AnimeSyncManager]:
+    """Return the one manager per token pair, or None until both platforms are authenticated."""
+    mal_client, anilist_client = get_clients(mal_token, anilist_token)
     if mal_client and anilist_client:
         return AnimeSyncManager(mal_client, anilist_client)
     else:
         return None
 
-sync_manager = get_sync_manager(st.session_state.mal_access_token, st.session_state.anilist_access_token)
-
 def main():
+    from streamlit_option_menu import option_menu
+    
+    # Streamlit drops elements a rerun doesn't re-emit, so the (constant) stylesheet is sent on every run
+    st.markdown(_CSS, unsafe_allow_html=True)
+    
     st.sidebar.title("AniSync")
     
     # Navigation
@@ -243,82 +405,209 @@ def render_sync_page():
                     )
                     st.info("If not redirected automatically, click the link above to continue in the same tab.")
     
-    # Sync options
-    st.header("⚙️ Sync Options")
-    with st.expander("Advanced Options"):
-        col1, col2 = st.columns(2)
-        with col1:
-            sync_direction = st.radio(
-                "Sync Direction",
-                ["Bidirectional", "MAL to AniList", "AniList to MAL"],
-                index=0,
-                help="Choose which direction to sync your lists"
+    # Sync options, sync button and results rerun on their own as a fragment
+    sync_section()
+    
+    # JSON import
+    st.header("📁 Import from JSON")
+    uploaded_file = st.file_uploader("Upload your anime list JSON", type=["json"], key="json_upload")
+    if uploaded_file is not None:
+        # Large exports are streamed entry by entry instead of being decoded up front
+        stream_upload = uploaded_file.size > JSON_STREAM_THRESHOLD_BYTES
+        json_data = None
+        if stream_upload:
+            st.info(f"Large file ({uploaded_file.size / (1024 * 1024):.1f} MB) will be streamed during import.")
+        else:
+            try:
+                st.session_state.json_data = _parse_upload(uploaded_file.getvalue())
+            except json.JSONDecodeError as e:
+                st.session_state.json_data = None
+                st.error(f"❌ Invalid JSON file: {str(e)}")
+            json_data = st.session_state.get("json_data")
+        
+        if json_data is not None and not isinstance(json_data, list):
+            st.error("❌ The JSON file must contain a list of entries")
+        elif json_data or stream_upload:
+            if json_data:
+                with st.expander(f"Preview ({len(json_data)} entries)"):
+                    st.json(json_data[:20])
+            
+            import_target = st.radio(
+                "Import To",
+                ["AniList", "MyAnimeList"],
+                horizontal=True,
+                key="json_import_target"
             )
-        with col2:
-            sync_method = st.radio(
-                "Sync Method",
-                ["Smart Sync (Recommended)", "Force Overwrite"],
-                index=0,
-                help="Smart sync only updates missing entries, while force overwrite updates all"
+            
+            if st.button("📥 Process JSON File", use_container_width=True, key="json_import_button"):
+                if not st.session_state.authenticated["mal"] or not st.session_state.authenticated["anilist"]:
+                    st.error("Please authenticate with both platforms")
+                    return
+                
+                # Skip files already imported to this platform (e.g. a double click)
+                upload_key = f"{hashlib.blake2b(uploaded_file.getvalue(), digest_size=8).hexdigest()}:{import_target}"
+                if upload_key in st.session_state.setdefault("uploaded_hashes", set()):
+                    st.info(f"This file has already been imported to {import_target}.")
+                    return
+                
+                sync_config = SyncConfig(
+                    mal_username=st.session_state.mal_username or "",
+                    anilist_username=st.session_state.anilist_username or "",
+                    target_platform=import_target
+                )
+                
+                try:
+                    manager = get_sync_manager(st.session_state.mal_access_token, st.session_state.anilist_access_token)
+                    if not manager:
+                        raise RuntimeError("Sync manager not initialized. Ensure both platforms are authenticated.")
+                    
+                    # Submit in batches so progress is visible and one failing batch doesn't lose the rest
+                    progress_bar = st.progress(0)
+                    status_text = st.empty()
+                    total = len(json_data) if json_data else None
+                    items = _iter_upload(uploaded_file) if stream_upload else iter(json_data)
+                    processed = 0
+                    success_count = 0
+                    errors: List[Dict[str, Any]] = []
+                    entries = []
+                    while True:
+                        batch = list(islice(items, JSON_IMPORT_BATCH_SIZE))
+                        if not batch:
+                            break
+                        batch_result = manager.sync_from_json(batch, sync_config)
+                        success_count += batch_result.success_count
+                        errors.extend(batch_result.errors)
+                        entries.extend(batch_result.differences.get("json_entries", []))
+                        processed += len(batch)
+                        if total:
+                            progress_bar.progress(processed / total)
+                            status_text.info(f"📥 Imported {processed}/{total} entries to {import_target}...")
+                        else:
+                            status_text.info(f"📥 Imported {processed} entries to {import_target}...")
+                    progress_bar.progress(100)
+                    
+                    result = SyncResult(
+                        differences={"json_entries": entries},
+                        success_count=success_count,
+                        error_count=len(errors),
+                        errors=errors,
+                        sync_id=f"json_import_{int(datetime.now().timestamp())}",
+                        timestamp=datetime.now().isoformat()
+                    )
+                    status_text.success("✅ Import completed!")
+                    if success_count:
+                        _invalidate_lists()
+                    
+                    st.session_state.uploaded_hashes.add(upload_key)
+                    st.session_state.last_sync_result = result
+                    get_sync_history().appendleft(_history_entry(result, "json_import", import_target))
+                    display_sync_result(result)
+                except Exception as e:
+                    st.error(f"❌ Error during import: {str(e)}")
+                    st.exception(e)
+
+@st.fragment
+def sync_section():
+    # Sync options (grouped in a form so changing them doesn't rerun the script)
+    st.header("⚙️ Sync Options")
+    with st.form("sync_form", border=False):
+        with st.expander("Advanced Options"):
+            col1, col2 = st.columns(2)
+            with col1:
+                sync_direction = st.radio(
+                    "Sync Direction",
+                    list(_DIRECTION_MAP),
+                    index=0,
+                    help="Choose which direction to sync your lists"
+                )
+            with col2:
+                sync_method = st.radio(
+                    "Sync Method",
+                    ["Smart Sync (Recommended)", "Force Overwrite"],
+                    index=0,
+                    help="Smart sync only updates missing entries, while force overwrite updates all"
+                )
+            max_concurrency = st.slider(
+                "Parallel Requests",
+                min_value=1,
+                max_value=16,
+                value=8,
+                help="How many entries are written to each platform at once; lower this if you hit rate limits"
             )
+        
+        submitted = st.form_submit_button("🔄 Start Sync", type="primary", use_container_width=True)
+    
+    # Quick size-up from the cached lists before committing to a sync
+    if st.button("🔍 Preview Differences", key="preview_sync"):
+        mal_list, anilist_list = _cached_lists()
+        if mal_list is None or anilist_list is None:
+            st.warning("Couldn't load both lists to preview; the sync will retry fetching them.")
+        else:
+            shared, mal_only, anilist_only = AnimeSyncManager.compare_counts(mal_list, anilist_list)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("On both", shared)
+            col2.metric("Only on MAL", mal_only)
+            col3.metric("Only on AniList", anilist_only)
+            st.caption("Exact title matches only; the sync also pairs near-identical titles.")
+    
+    if st.session_state.get("cancel_sync"):
+        st.warning("Sync cancelled. Entries already written were kept; run the sync again to finish.")
     
     # Sync button
-    if st.button("🔄 Start Sync", type="primary", use_container_width=True, key="sync_button"):
+    if submitted:
         if not st.session_state.authenticated["mal"] or not st.session_state.authenticated["anilist"]:
             st.error("Please authenticate with both platforms")
             return
         
-        # Determine sync direction
-        direction_map = {
-            "Bidirectional": SyncDirection.BIDIRECTIONAL,
-            "MAL to AniList": SyncDirection.MAL_TO_ANILIST,
-            "AniList to MAL": SyncDirection.ANILIST_TO_MAL
-        }
-        
         # Create sync config
         sync_config = SyncConfig(
             mal_username=st.session_state.mal_username,
             anilist_username=st.session_state.anilist_username,
-            target_platform=("MyAnimeList" if "to MAL" in sync_direction else "AniList")
+            target_platform=("MyAnimeList" if "to MAL" in sync_direction else "AniList"),
+            max_concurrency=max_concurrency
         )
         
         # Show progress
         progress_bar = st.progress(0)
         status_text = st.empty()
+        # Clicking this reruns the fragment, which interrupts the sync at its next progress update
+        st.button("⏹️ Cancel Sync", key="cancel_sync")
+        
+        def show_progress(fraction: float, message: str) -> None:
+            progress_bar.progress(fraction)
+            status_text.info(f"🔄 {message}")
         
         try:
-            # Update progress
-            progress_bar.progress(10)
-            status_text.info("🔍 Fetching your anime lists...")
-            
-            # Perform sync
-            progress_bar.progress(30)
-            status_text.info("🔄 Syncing your lists...")
-            
-            # Build a fresh manager with current tokens
+            # Reuse the cached manager (and its clients' connection pools) for the current tokens
             manager = get_sync_manager(st.session_state.mal_access_token, st.session_state.anilist_access_token)
             if not manager:
                 raise RuntimeError("Sync manager not initialized. Ensure both platforms are authenticated.")
+            
+            # Reuse lists fetched within the cache TTL instead of downloading them on every click
+            show_progress(0.05, "Loading your anime lists...")
+            mal_list, anilist_list = _cached_lists()
+            
+            # Perform sync, updating progress as the manager reports each stage and entry
             result = manager.sync(
                 config=sync_config,
-                direction=direction_map[sync_direction]
+                direction=_DIRECTION_MAP[sync_direction],
+                progress_callback=show_progress,
+                mal_list=mal_list,
+                anilist_list=anilist_list
             )
+            if result.success_count:
+                _invalidate_lists()
             
             # Save result
             st.session_state.last_sync_result = result
-            st.session_state.sync_history.insert(0, {
-                "timestamp": datetime.now().isoformat(),
-                "result": result,
-                "config": sync_config.dict()
-            })
+            get_sync_history().appendleft(
+                _history_entry(result, _DIRECTION_MAP[sync_direction].label, sync_config.target_platform)
+            )
             
             # Show success
             progress_bar.progress(100)
             status_text.success("✅ Sync completed successfully!")
             
-            # Display results
-            display_sync_result(result)
-            
         except Exception as e:
             progress_bar.progress(0)
             status_text.error(f"❌ Error during sync: {str(e)}")
@@ -327,18 +616,20 @@ def render_sync_page():
     # Show last sync result if available
     if st.session_state.last_sync_result:
         st.header("📊 Last Sync Result")
-        display_sync_result(st.session_state.last_sync_result)
+        _result_view(st.session_state.last_sync_result)
 
 def render_sync_history():
     st.title("📜 Sync History")
     
-    if not st.session_state.sync_history:
+    history = get_sync_history()
+    if not history:
         st.info("No sync history available. Perform a sync to see history here.")
         return
     
-    for i, entry in enumerate(st.session_state.sync_history):
+    for i, entry in enumerate(history):
         with st.expander(f"Sync at {entry['timestamp']}"):
-            st.json(entry)
+            # Serialised up front so no live objects are handed to the frontend
+            st.json(orjson.dumps(entry, default=str).decode())
 
 def render_settings():
     st.title("⚙️ Settings")
@@ -359,7 +650,7 @@ def render_settings():
                           help="Automatically sync when changes are detected")
     
     if st.button("Clear Sync History", type="secondary"):
-        st.session_state.sync_history = []
+        get_sync_history().clear()
         st.success("Sync history cleared!")
 
 def render_about():
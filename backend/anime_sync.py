@@ -1,22 +1,52 @@
-from backend.models import AnimeEntry, PlatformList, SyncConfig, SyncResult, JSONAnimeEntry, SyncDifference
+from backend.models import AnimeEntry, PlatformList, SyncConfig, SyncResult, SyncDifference, normalize_title
 from backend.api_clients import MALClient, AniListClient
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Union
+from collections import deque
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from rapidfuzz import fuzz, process
+from dataclasses import replace
 from datetime import datetime
+from functools import lru_cache
+import ijson
 import logging
+import orjson
+import queue
+import requests
 import random
+import threading
 import time
-from enum import Enum
+from enum import Enum, IntFlag, auto
 from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class SyncDirection(Enum):
-    """Enum for sync direction."""
-    MAL_TO_ANILIST = "mal_to_anilist"
-    ANILIST_TO_MAL = "anilist_to_mal"
-    BIDIRECTIONAL = "bidirectional"
+# Validates a whole batch of imported entries in one call into pydantic-core
+_ENTRY_LIST_ADAPTER = TypeAdapter(List[AnimeEntry])
+
+# HTTP statuses that indicate a transient failure worth retrying. 429 is absent on purpose:
+# RateLimitedSession has already re-sent it RATE_LIMIT_RETRIES times before it gets here
+RETRYABLE_STATUS = frozenset({500, 502, 503, 504, 529})
+
+# Long-lived workers for list downloads, so a sync doesn't spawn fresh threads for its two fetches
+_FETCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="list-fetch")
+
+# Upper bound on concurrent write requests per platform, shared by every sync in the process
+MAX_IN_FLIGHT_WRITES = 16
+_WRITE_SLOTS: Dict[str, threading.BoundedSemaphore] = {}
+
+class SyncDirection(IntFlag):
+    """Sync direction as bit flags, so checking whether a platform is written to is one AND."""
+    MAL_TO_ANILIST = auto()
+    ANILIST_TO_MAL = auto()
+    BIDIRECTIONAL = MAL_TO_ANILIST | ANILIST_TO_MAL
+
+    @property
+    def label(self) -> str:
+        """Name used in logs and sync history, e.g. "mal_to_anilist"."""
+        return self.name.lower()
 
 class SyncStatus(Enum):
     PENDING = "pending"
@@ -32,60 +62,216 @@ class AnimeSyncManager:
         """Initialize with optional API clients."""
         self.mal_client = mal_client
         self.anilist_client = anilist_client
-        self.sync_history: List[SyncResult] = []
+        self.sync_history: Deque[Dict[str, Any]] = deque(maxlen=100)  # Oldest runs drop off automatically
         self.sync_staging = {}  # Store staging data between sync operations
+        self.list_snapshots: Dict[str, Tuple[float, PlatformList]] = {}  # Last fetched list per platform
+        self.fuzzy_match_cutoff = 90  # Minimum fuzz.ratio for titles that differ only slightly
+        self.snapshot_max_age = 3600  # Seconds before a full re-fetch, which also picks up deletions
         self.max_retries = 3
-        self.retry_delay = 2  # Initial delay in seconds
-        self.jitter = 0.5  # Random jitter factor for retry delay
-
-        # Status mapping between platforms
-        self.status_mapping = {
-            "mal_to_anilist": {
-                'watching': 'CURRENT',
-                'completed': 'COMPLETED',
-                'on_hold': 'PAUSED',
-                'dropped': 'DROPPED',
-                'plan_to_watch': 'PLANNING',
-                '': 'PLANNING'  # Default for MAL's empty status
-            },
-            "anilist_to_mal": {
-                'CURRENT': 'watching',
-                'COMPLETED': 'completed',
-                'PAUSED': 'on_hold',
-                'DROPPED': 'dropped',
-                'PLANNING': 'plan_to_watch',
-                'REPEATING': 'watching',
-                '': 'plan_to_watch'  # Default for AniList's empty status
-            }
-        }
+        self.retry_delay = 1.0  # Initial backoff window in seconds, doubled per attempt
+        self.max_retry_delay = 30  # Cap on the backoff window in seconds
+        self.max_concurrency = 8  # Maximum in-flight write requests per platform
+        self.anilist_batch_size = 25  # Entries per aliased AniList GraphQL mutation
+
+    # The memoized models.normalize_title itself, so callers hit its lru_cache without a wrapper frame
+    _normalize_title = staticmethod(normalize_title)
 
-    def _normalize_title(self, title: str) -> str:
+    def _calculate_jittered_delay(self, attempt: int) -> float:
         """
-        Normalize anime titles for comparison.
+        Calculate jittered delay for retry attempts.
+        
+        Uses "full jitter": a uniform draw over the whole exponential window, so concurrent
+        writers that failed together spread their retries out instead of retrying in step.
         
         Args:
-            title: The title to normalize
+            attempt: Current attempt number (1-based)
             
         Returns:
-            str: Normalized title
+            float: Delay in seconds
+        """
+        window = min(self.retry_delay * (2 ** (attempt - 1)), self.max_retry_delay)
+        return random.uniform(0, window)
+
+    def _retry_after(self, error: BaseException) -> Optional[float]:
         """
-        if not title:
-            return ""
-        return title.lower().strip()
+        Extract the server-requested wait from an unavailable (503) response.
         
-    def _calculate_jittered_delay(self, attempt: int) -> float:
+        Uses Retry-After, or AniList's X-RateLimit-Reset epoch when Retry-After is absent,
+        padded by up to 50% so clients released together don't retry in lockstep.
+        
+        Args:
+            error: Exception raised by a client call; the HTTP error may be wrapped as its cause
+            
+        Returns:
+            Optional[float]: Seconds to wait, or None if the error carries no usable header
         """
-        Calculate jittered delay for retry attempts.
+        while error is not None:
+            response = getattr(error, "response", None)
+            if response is not None and response.status_code == 503:
+                headers = response.headers or {}
+                try:
+                    if headers.get("Retry-After") is not None:
+                        delay = float(headers["Retry-After"])
+                    elif headers.get("X-RateLimit-Reset") is not None:
+                        delay = max(0.0, float(headers["X-RateLimit-Reset"]) - time.time())
+                    else:
+                        return None
+                except (TypeError, ValueError):
+                    return None
+                return delay * random.uniform(1.0, 1.5)
+            error = error.__cause__
+        return None
+
+    def _is_retryable(self, error: BaseException) -> bool:
+        """
+        Decide whether a failed call is worth retrying.
+        
+        Connection errors, timeouts and RETRYABLE_STATUS responses are transient; any other
+        HTTP status (e.g. 400/404) or a non-HTTP error such as "title not found" will fail
+        the same way again.
         
         Args:
-            attempt: Current attempt number (1-based)
+            error: Exception raised by a client call; the HTTP error may be wrapped as its cause
             
         Returns:
-            float: Delay in seconds
+            bool: True if another attempt may succeed
+        """
+        while error is not None:
+            if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+                return True
+            response = getattr(error, "response", None)
+            if response is not None:
+                return response.status_code in RETRYABLE_STATUS
+            error = error.__cause__
+        return False
+
+    @staticmethod
+    def _http_status(error: BaseException) -> Optional[int]:
+        """Return the HTTP status behind an error, looking through wrapped causes."""
+        while error is not None:
+            response = getattr(error, "response", None)
+            if response is not None:
+                return response.status_code
+            error = error.__cause__
+        return None
+
+    @staticmethod
+    def _snapshot_key(entry: AnimeEntry) -> Any:
+        """Identify an entry within one platform's list: its platform id, or the title if it has none."""
+        return entry.anilist_id or entry.mal_id or entry.title
+
+    def fetch_list(self, platform: str, username: Optional[str] = None) -> PlatformList:
+        """
+        Fetch a user's list, downloading only entries changed since the last snapshot.
+        
+        Args:
+            platform: "mal" or "anilist"
+            username: Username to fetch; defaults to the client's own user
+            
+        Returns:
+            PlatformList: The full, up-to-date list
+        """
+        client = self.mal_client if platform == "mal" else self.anilist_client
+        key = f"{platform}:{username or ''}"
+        snapshot = self.list_snapshots.get(key)
+        
+        if snapshot and time.monotonic() - snapshot[0] < self.snapshot_max_age:
+            known = snapshot[1]
+            since = max((entry.updated_at for entry in known.anime_list if entry.updated_at), default=None)
+            if since is not None:
+                delta = client.get_user_list(username, since=since)
+                # Keyed by id: distinct anime can share a title (e.g. Berserk 1997 and 2016), and the
+                # inclusive cutoff re-sends the newest known entries, which this dedupes
+                merged = {self._snapshot_key(entry): entry for entry in known.anime_list}
+                merged.update((self._snapshot_key(entry), entry) for entry in delta.anime_list)
+                platform_list = PlatformList(username=known.username, anime_list=list(merged.values()))
+                logger.info(f"Merged {len(delta.anime_list)} changed entries into the {platform} snapshot")
+                # Keep the original snapshot time so deletions are still picked up by the periodic full fetch
+                self.list_snapshots[key] = (snapshot[0], platform_list)
+                return platform_list
+        
+        platform_list = client.get_user_list(username)
+        self.list_snapshots[key] = (time.monotonic(), platform_list)
+        return platform_list
+
+    def _fuzzy_matches(self, mal_titles: List[str], anilist_titles: List[str]) -> Dict[str, str]:
+        """
+        Pair up normalized titles that are near-identical but not equal.
+        
+        Word order is ignored (token-sort matching), so "season 2 x" pairs with "x season 2".
+        Tokens are sorted once per title rather than once per compared pair, and candidates are
+        bucketed by first character of the sorted form so each comparison matrix stays small.
+        Titles whose numbers differ (e.g. seasons) are never paired.
+        
+        Args:
+            mal_titles: Normalized MAL titles without an exact match
+            anilist_titles: Normalized AniList titles without an exact match
+            
+        Returns:
+            Dict[str, str]: Matched MAL title -> AniList title
         """
-        base_delay = min(self.retry_delay * (2 ** (attempt - 1)), 30)  # Exponential backoff with max 30s
-        jitter = random.uniform(1 - self.jitter, 1 + self.jitter)
-        return base_delay * jitter
+        mal_sorted = {" ".join(sorted(title.split())): title for title in mal_titles if title}
+        anilist_sorted = {" ".join(sorted(title.split())): title for title in anilist_titles if title}
+        
+        buckets: Dict[str, List[str]] = {}
+        for key in anilist_sorted:
+            buckets.setdefault(key[0], []).append(key)
+        
+        matches: Dict[str, str] = {}
+        by_first: Dict[str, List[str]] = {}
+        for key in mal_sorted:
+            if key[0] in buckets:
+                by_first.setdefault(key[0], []).append(key)
+        
+        for first, queries in by_first.items():
+            choices = buckets[first]
+            # fuzz.ratio on pre-sorted tokens is fuzz.token_sort_ratio without the per-pair sort
+            scores = process.cdist(queries, choices, scorer=fuzz.ratio,
+                                   score_cutoff=self.fuzzy_match_cutoff, workers=-1)
+            taken = set()
+            for row, query in enumerate(queries):
+                query_numbers = self._numbers(query)
+                for col in scores[row].argsort()[::-1]:
+                    if scores[row][col] == 0:
+                        break
+                    choice = choices[col]
+                    if choice not in taken and query_numbers == self._numbers(choice):
+                        matches[mal_sorted[query]] = anilist_sorted[choice]
+                        taken.add(choice)
+                        break
+        return matches
+
+    @staticmethod
+    @lru_cache(maxsize=16384)
+    def _numbers(title: str) -> Tuple[str, ...]:
+        """Return the numeric tokens of a title, used to keep sequels apart; cached like normalize_title."""
+        return tuple(token for token in title.split() if token.isdigit())
+
+    @staticmethod
+    def _hash_lists(mal_list: Optional[PlatformList], anilist_list: Optional[PlatformList],
+                    direction: SyncDirection) -> int:
+        """Fingerprint both lists and the direction; AnimeEntry is frozen, so entries hash by value."""
+        return hash((
+            direction,
+            tuple(mal_list.anime_list) if mal_list else None,
+            tuple(anilist_list.anime_list) if anilist_list else None,
+        ))
+
+    @staticmethod
+    def compare_counts(mal_list: PlatformList, anilist_list: PlatformList) -> Tuple[int, int, int]:
+        """
+        Count shared and one-sided titles without building the full comparison.
+        
+        Only exact normalized-title matches are counted, so the one-sided counts are an upper
+        bound on what _compare_lists (which also fuzzy-matches) would report.
+        
+        Returns:
+            Tuple[int, int, int]: (in both, MAL only, AniList only)
+        """
+        mal_titles = frozenset(a.normalized_title for a in mal_list.anime_list)
+        anilist_titles = frozenset(a.normalized_title for a in anilist_list.anime_list)
+        return (len(mal_titles & anilist_titles), len(mal_titles - anilist_titles),
+                len(anilist_titles - mal_titles))
 
     def _compare_lists(self, mal_list: PlatformList, anilist_list: PlatformList) -> Dict:
         """Compare two anime lists and find differences.
@@ -99,100 +285,224 @@ class AnimeSyncManager:
                 - intersection: List of anime present in both lists
                 - mal_only: List of anime only in MAL list
                 - anilist_only: List of anime only in AniList list
+                - changed: (MAL entry, AniList entry) pairs present in both lists whose
+                  status, progress or score differ
         """
-        mal_titles = {self._normalize_title(a.title): a for a in mal_list.anime_list}
-        anilist_titles = {self._normalize_title(a.title): a for a in anilist_list.anime_list}
+        # Entries with the same MAL id are the same anime: MAL entries carry it and AniList media
+        # expose idMal, so most pairs are settled by an integer lookup before any title work
+        mal_by_id = {a.mal_id: a for a in mal_list.anime_list if a.mal_id}
+        anilist_by_id = {a.mal_id: a for a in anilist_list.anime_list if a.mal_id}
+        pairs = [(entry, anilist_by_id[mal_id]) for mal_id, entry in mal_by_id.items() if mal_id in anilist_by_id]
+        matched_ids = mal_by_id.keys() & anilist_by_id.keys()
+
+        # Title -> entry per side for the rest; the shared titles come from one C-level set intersection
+        # of the key views, and the comprehensions walk the dicts so every bucket keeps list order.
+        mal_titles = {a.normalized_title: a for a in mal_list.anime_list if a.mal_id not in matched_ids}
+        anilist_titles = {a.normalized_title: a for a in anilist_list.anime_list if a.mal_id not in matched_ids}
+
+        # Nothing can match against an empty side; skip the set and fuzzy passes
+        if not mal_titles or not anilist_titles:
+            return self._comparison(pairs, list(mal_titles.values()), list(anilist_titles.values()))
 
-        intersection = []
-        mal_only = []
-        anilist_only = []
+        shared = {title for title in mal_titles.keys() & anilist_titles.keys()
+                  if self._may_pair(mal_titles[title], anilist_titles[title])}
 
-        # Find intersection
-        for title in mal_titles:
-            if title in anilist_titles:
-                intersection.append(mal_titles[title])
+        pairs.extend((entry, anilist_titles[title]) for title, entry in mal_titles.items() if title in shared)
+        mal_unmatched = {title: entry for title, entry in mal_titles.items() if title not in shared}
+        anilist_unmatched = {title: entry for title, entry in anilist_titles.items() if title not in shared}
 
-        # Find differences
-        for title in mal_titles:
-            if title not in anilist_titles:
-                mal_only.append(mal_titles[title])
+        # Titles that differ only in spelling or romanization still count as the same anime
+        fuzzy = {mal_title: anilist_title for mal_title, anilist_title
+                 in self._fuzzy_matches(list(mal_unmatched), list(anilist_unmatched)).items()
+                 if self._may_pair(mal_unmatched[mal_title], anilist_unmatched[anilist_title])}
+        matched_anilist = set(fuzzy.values())
 
-        for title in anilist_titles:
-            if title not in mal_titles:
-                anilist_only.append(anilist_titles[title])
+        pairs.extend((mal_unmatched[mal_title], anilist_unmatched[anilist_title])
+                     for mal_title, anilist_title in fuzzy.items())
+        mal_only = [entry for title, entry in mal_unmatched.items() if title not in fuzzy]
+        anilist_only = [entry for title, entry in anilist_unmatched.items() if title not in matched_anilist]
 
+        return self._comparison(pairs, mal_only, anilist_only)
+
+    def _comparison(self, pairs: List[Tuple[AnimeEntry, AnimeEntry]], mal_only: List[AnimeEntry],
+                    anilist_only: List[AnimeEntry]) -> Dict:
+        """Assemble _compare_lists' result from the matched (MAL, AniList) pairs and the unmatched entries."""
         return {
-            "intersection": intersection,
+            "intersection": [mal_entry for mal_entry, _ in pairs],
             "mal_only": mal_only,
-            "anilist_only": anilist_only
+            "anilist_only": anilist_only,
+            "changed": [(m, a) for m, a in pairs if self._entry_state(m) != self._entry_state(a)]
         }
 
-    def _sync_to_mal(self, mal_username: str, entries: List[AnimeEntry]) -> Dict:
+    @staticmethod
+    def _entry_state(entry: AnimeEntry) -> Tuple[str, int, int]:
+        """What a sync keeps in step, comparable across platforms: status in MAL's terms, progress, score."""
+        status = entry.status or ""
+        status = MALClient.STATUS_MAP.get(status) or MALClient.STATUS_MAP.get(status.lower(), status)
+        return status, entry.episodes_watched or 0, entry.score or 0
+
+    @staticmethod
+    def _may_pair(mal_entry: AnimeEntry, anilist_entry: AnimeEntry) -> bool:
+        """Entries that both carry a MAL id were already compared by id, so a title match between them
+        is a different anime with a similar title (e.g. a remake)."""
+        return not (mal_entry.mal_id and anilist_entry.mal_id)
+
+    @staticmethod
+    def _plan_updates(changed: List[Tuple[AnimeEntry, AnimeEntry]],
+                      direction: SyncDirection) -> Tuple[List[AnimeEntry], List[AnimeEntry]]:
         """
-        Sync entries to MyAnimeList with retry logic.
+        Decide which side of each differing pair to overwrite.
+        
+        One-way syncs overwrite the target. Bidirectional syncs copy the more recently updated
+        side and leave a pair alone when that can't be told. The write keeps the target entry's
+        title and ids, so it lands on the matched anime without another lookup.
         
         Args:
-            mal_username: MAL username
-            entries: List of AnimeEntry objects to sync
+            changed: (MAL entry, AniList entry) pairs whose state differs
+            direction: Direction of synchronization
             
         Returns:
-            Dict: Results with success/error counts and messages
+            Tuple[List[AnimeEntry], List[AnimeEntry]]: Entries to write to MAL, entries to write to AniList
         """
-        success = 0
-        errors = []
-        
-        logger.info(f"Starting sync to MAL for {len(entries)} entries")
+        to_mal: List[AnimeEntry] = []
+        to_anilist: List[AnimeEntry] = []
+        for mal_entry, anilist_entry in changed:
+            if direction == SyncDirection.BIDIRECTIONAL:
+                mal_time, anilist_time = mal_entry.updated_at, anilist_entry.updated_at
+                if mal_time is None or anilist_time is None or mal_time == anilist_time:
+                    continue
+                towards_anilist = mal_time > anilist_time
+            else:
+                towards_anilist = direction == SyncDirection.MAL_TO_ANILIST
+            source, target = (mal_entry, anilist_entry) if towards_anilist else (anilist_entry, mal_entry)
+            update = replace(target, status=source.status, score=source.score,
+                             episodes_watched=source.episodes_watched)
+            (to_anilist if towards_anilist else to_mal).append(update)
+        return to_mal, to_anilist
+
+    def _run_with_retries(self, description: str, call: Callable[[], Any]) -> Any:
+        """
+        Run a platform call, retrying failures with backoff.
         
-        for entry in entries:
-            last_error = None
+        Args:
+            description: What is being synced, used in log messages
+            call: Zero-argument callable performing the request
             
-            for attempt in range(1, self.max_retries + 1):
-                try:
-                    self.mal_client.save_list_entry(
-                        title=entry.title,
-                        status=entry.status,
-                        score=entry.score,
-                        progress=entry.episodes_watched,
-                    )
-                    success += 1
-                    logger.info(f"Successfully synced '{entry.title}' to MAL")
-                    break  # Success, exit retry loop
-                    
-                except Exception as e:
-                    last_error = str(e)
-                    if attempt < self.max_retries:
-                        delay = self._calculate_jittered_delay(attempt)
-                        logger.warning(
-                            f"Attempt {attempt} failed for '{entry.title}'. "
-                            f"Retrying in {delay:.1f}s. Error: {last_error}"
-                        )
-                        time.sleep(delay)
-                    else:
-                        error_msg = f"Failed to sync '{entry.title}' to MAL after {self.max_retries} attempts: {last_error}"
-                        logger.error(error_msg)
-                        errors.append(error_msg)
+        Returns:
+            Any: The value returned by call
             
-            # Be gentle with the API
-            if success > 0 and success % 5 == 0:
-                time.sleep(1)
+        Raises:
+            Exception: The last error once max_retries attempts have failed, or the first
+                error straight away if it isn't retryable
+        """
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                return call()
+                
+            except Exception as e:
+                if attempt == self.max_retries or not self._is_retryable(e):
+                    raise
+                # Honor the server's Retry-After on 503s, otherwise back off with jitter
+                delay = self._retry_after(e)
+                if delay is None:
+                    delay = self._calculate_jittered_delay(attempt)
+                logger.warning("Attempt %d failed for %s. Retrying in %.1fs. Error: %s",
+                               attempt, description, delay, e)
+                time.sleep(delay)
 
-        result = {
-            "success": success,
-            "errors": errors,
-            "total_attempted": len(entries),
-            "timestamp": datetime.utcnow().isoformat()
-        }
+    def _sync_entry(self, platform: str, save_entry: Callable[[AnimeEntry], Any],
+                    entry: AnimeEntry) -> Optional[Dict[str, str]]:
+        """
+        Sync a single entry with retry logic.
         
-        logger.info(f"Completed MAL sync: {success} succeeded, {len(errors)} failed")
-        return result
+        Args:
+            platform: Display name of the target platform
+            save_entry: Callable that writes one entry to the platform
+            entry: AnimeEntry to sync
+            
+        Returns:
+            Optional[Dict[str, str]]: Error with title, platform and message if every attempt failed,
+                otherwise None
+        """
+        try:
+            self._run_with_retries(f"'{entry.title}'", lambda: save_entry(entry))
+        except Exception as e:
+            logger.error("Failed to sync '%s' to %s: %s", entry.title, platform, e)
+            return {"title": entry.title, "platform": platform, "error": str(e)}
+        
+        logger.info("Successfully synced '%s' to %s", entry.title, platform)
+        return None
 
-    def _sync_to_anilist(self, anilist_username: str, entries: List[AnimeEntry]) -> Dict:
+    def _sync_anilist_batch(self, batch: List[AnimeEntry]) -> List[Optional[Dict[str, str]]]:
         """
-        Sync entries to AniList with retry logic.
+        Sync a batch of entries to AniList with one aliased GraphQL mutation.
+        
+        A 400 for the whole document (e.g. one entry with a value AniList rejects) fails every
+        alias in it, so such a batch is split in half and each half retried, isolating the bad
+        entries at the cost of a few extra requests instead of failing the whole batch.
         
         Args:
-            anilist_username: AniList username
+            batch: AnimeEntry objects to sync, at most anilist_batch_size long
+            
+        Returns:
+            List[Optional[Dict[str, str]]]: Per-entry error, or None where the entry was saved
+        """
+        payload = [{
+            "title": entry.title,
+            "status": entry.status,
+            "score": entry.score * 10 if entry.score is not None else None,  # Convert 0-10 to 0-100
+            "progress": entry.episodes_watched,
+            "media_id": entry.anilist_id,
+            "mal_id": entry.mal_id,
+        } for entry in batch]
+        
+        try:
+            results = self._run_with_retries(
+                f"AniList batch of {len(batch)} entries",
+                lambda: self.anilist_client.save_list_entries_batch(payload)
+            )
+        except Exception as e:
+            if len(batch) > 1 and self._http_status(e) == 400:
+                mid = len(batch) // 2
+                logger.warning("AniList rejected a batch of %d entries, retrying as two halves: %s", len(batch), e)
+                return self._sync_anilist_batch(batch[:mid]) + self._sync_anilist_batch(batch[mid:])
+            results = [str(e)] * len(batch)
+        
+        errors = []
+        for entry, error in zip(batch, results):
+            if error:
+                logger.error("Failed to sync '%s' to AniList: %s", entry.title, error)
+                errors.append({"title": entry.title, "platform": "AniList", "error": error})
+            else:
+                logger.info("Successfully synced '%s' to AniList", entry.title)
+                errors.append(None)
+        return errors
+
+    @staticmethod
+    def _entry_problem(entry: AnimeEntry) -> Optional[str]:
+        """Return why a write of this entry can't succeed, or None if it's worth sending."""
+        if not (entry.title or "").strip() and not (entry.mal_id or entry.anilist_id):
+            return "Entry has no title or id to look the anime up by"
+        if not entry.status and entry.score is None and entry.episodes_watched is None:
+            return "At least one of status, score, or progress must be provided"
+        return None
+
+    def _sync_entries(self, platform: str, sync_batch: Callable[[List[AnimeEntry]], List[Optional[Dict[str, str]]]],
+                      entries: List[AnimeEntry], batch_size: int = 1,
+                      on_entry_done: Optional[Callable[[], None]] = None,
+                      max_concurrency: Optional[int] = None) -> Dict:
+        """
+        Sync entries concurrently, with at most max_concurrency requests in flight per call
+        and MAX_IN_FLIGHT_WRITES per platform across the whole process.
+        
+        Args:
+            platform: Display name of the target platform
+            sync_batch: Callable that writes a batch of entries and returns a per-entry error or None
             entries: List of AnimeEntry objects to sync
+            batch_size: Number of entries handed to each sync_batch call
+            on_entry_done: Optional callback invoked on the calling thread after each entry finishes;
+                raising from it cancels the batches that haven't started
+            max_concurrency: Optional per-call override of self.max_concurrency
             
         Returns:
             Dict: Results with success/error counts and messages
@@ -200,40 +510,42 @@ class AnimeSyncManager:
         success = 0
         errors = []
         
-        logger.info(f"Starting sync to AniList for {len(entries)} entries")
-        
+        # Entries that are bound to fail are reported up front instead of spending requests on them
+        sendable = []
         for entry in entries:
-            last_error = None
-            
-            for attempt in range(1, self.max_retries + 1):
-                try:
-                    self.anilist_client.save_list_entry(
-                        title=entry.title,
-                        status=entry.status,
-                        score=entry.score * 10 if entry.score is not None else None,  # Convert 0-10 to 0-100
-                        progress=entry.episodes_watched,
-                    )
-                    success += 1
-                    logger.info(f"Successfully synced '{entry.title}' to AniList")
-                    break  # Success, exit retry loop
-                    
-                except Exception as e:
-                    last_error = str(e)
-                    if attempt < self.max_retries:
-                        delay = self._calculate_jittered_delay(attempt)
-                        logger.warning(
-                            f"Attempt {attempt} failed for '{entry.title}'. "
-                            f"Retrying in {delay:.1f}s. Error: {last_error}"
-                        )
-                        time.sleep(delay)
-                    else:
-                        error_msg = f"Failed to sync '{entry.title}' to AniList after {self.max_retries} attempts: {last_error}"
-                        logger.error(error_msg)
-                        errors.append(error_msg)
-            
-            # Be gentle with the API
-            if success > 0 and success % 5 == 0:
-                time.sleep(1)
+            problem = self._entry_problem(entry)
+            if problem is None:
+                sendable.append(entry)
+                continue
+            logger.error("Skipping '%s' for %s: %s", entry.title, platform, problem)
+            errors.append({"title": entry.title, "platform": platform, "error": problem})
+            if on_entry_done:
+                on_entry_done()
+        batches = [sendable[i:i + batch_size] for i in range(0, len(sendable), batch_size)]
+        
+        logger.info(f"Starting sync to {platform} for {len(entries)} entries")
+        
+        slots = _WRITE_SLOTS.setdefault(platform, threading.BoundedSemaphore(MAX_IN_FLIGHT_WRITES))
+        
+        def run(batch: List[AnimeEntry]) -> List[Optional[Dict[str, str]]]:
+            with slots:
+                return sync_batch(batch)
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency or self.max_concurrency) as executor:
+            try:
+                for batch_errors in executor.map(run, batches):
+                    for error in batch_errors:
+                        if error:
+                            errors.append(error)
+                        else:
+                            success += 1
+                        if on_entry_done:
+                            on_entry_done()
+            except BaseException:
+                # The caller aborted (e.g. the UI interrupted the run); don't start queued batches
+                logger.warning(f"{platform} sync cancelled after {success + len(errors)} of {len(entries)} entries")
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
 
         result = {
             "success": success,
@@ -242,15 +554,124 @@ class AnimeSyncManager:
             "timestamp": datetime.utcnow().isoformat()
         }
         
+        logger.info(f"Completed {platform} sync: {success} succeeded, {len(errors)} failed")
         return result
+
+    def _run_directions(self, jobs: Dict[str, Callable[[Callable[[], None]], Dict]],
+                        on_entry_done: Optional[Callable[[], None]] = None) -> Dict[str, Dict]:
+        """
+        Run each direction's sync on its own thread, since they write to different platforms.
+        
+        Args:
+            jobs: Result key -> callable taking a per-entry callback and returning its sync result
+            on_entry_done: Optional callback invoked on the calling thread after each entry finishes;
+                raising from it cancels the batches that haven't started in every direction
+            
+        Returns:
+            Dict: Result key -> that direction's sync result
+        """
+        if len(jobs) < 2:
+            return {key: job(on_entry_done) for key, job in jobs.items()}
+        
+        ticks: "queue.SimpleQueue[None]" = queue.SimpleQueue()
+        cancelled = threading.Event()
+        
+        def tick() -> None:
+            if cancelled.is_set():
+                raise CancelledError()
+            ticks.put(None)
+        
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="sync-direction") as executor:
+            futures = {key: executor.submit(job, tick) for key, job in jobs.items()}
+            try:
+                pending = set(futures.values())
+                while pending:
+                    try:
+                        ticks.get(timeout=0.1)
+                    except queue.Empty:
+                        pending = {f for f in pending if not f.done()}
+                        continue
+                    if on_entry_done:
+                        on_entry_done()
+                # Entries that finished between the last tick and their worker exiting
+                while not ticks.empty():
+                    ticks.get()
+                    if on_entry_done:
+                        on_entry_done()
+            except BaseException:
+                cancelled.set()
+                raise
+        return {key: future.result() for key, future in futures.items()}
+
+    def _sync_to_mal(self, mal_username: str, entries: List[AnimeEntry],
+                     on_entry_done: Optional[Callable[[], None]] = None,
+                     max_concurrency: Optional[int] = None) -> Dict:
+        """
+        Sync entries to MyAnimeList with retry logic.
+        
+        Args:
+            mal_username: MAL username
+            entries: List of AnimeEntry objects to sync
+            on_entry_done: Optional callback invoked after each entry finishes
+            max_concurrency: Optional override of self.max_concurrency for this call
+            
+        Returns:
+            Dict: Results with success/error counts and messages
+        """
+        def save_entry(entry: AnimeEntry) -> bool:
+            return self.mal_client.save_list_entry(
+                title=entry.title,
+                status=entry.status,
+                score=entry.score,
+                progress=entry.episodes_watched,
+                anime_id=entry.mal_id,
+            )
+        
+        return self._sync_entries(
+            "MAL",
+            lambda batch: [self._sync_entry("MAL", save_entry, entry) for entry in batch],
+            entries,
+            on_entry_done=on_entry_done,
+            max_concurrency=max_concurrency
+        )
+
+    def _sync_to_anilist(self, anilist_username: str, entries: List[AnimeEntry],
+                         on_entry_done: Optional[Callable[[], None]] = None,
+                         max_concurrency: Optional[int] = None) -> Dict:
+        """
+        Sync entries to AniList in batches of aliased GraphQL mutations.
+        
+        Args:
+            anilist_username: AniList username
+            entries: List of AnimeEntry objects to sync
+            on_entry_done: Optional callback invoked after each entry finishes
+            max_concurrency: Optional override of self.max_concurrency for this call
+            
+        Returns:
+            Dict: Results with success/error counts and messages
+        """
+        return self._sync_entries(
+            "AniList",
+            self._sync_anilist_batch,
+            entries,
+            batch_size=self.anilist_batch_size,
+            on_entry_done=on_entry_done,
+            max_concurrency=max_concurrency
+        )
     
-    def sync(self, config: SyncConfig, direction: SyncDirection = SyncDirection.BIDIRECTIONAL) -> SyncResult:
+    def sync(self, config: SyncConfig, direction: SyncDirection = SyncDirection.BIDIRECTIONAL,
+             progress_callback: Optional[Callable[[float, str], None]] = None,
+             mal_list: Optional[PlatformList] = None,
+             anilist_list: Optional[PlatformList] = None) -> SyncResult:
         """
         Synchronize anime lists between MAL and AniList.
         
         Args:
             config: Sync configuration
             direction: Direction of synchronization
+            progress_callback: Optional callable receiving (fraction_complete, message) as the sync advances
+            mal_list: Optional pre-fetched MAL list; fetched from MAL when omitted
+            anilist_list: Optional pre-fetched AniList list; fetched from AniList when omitted
             
         Returns:
             SyncResult: Result of the sync operation
@@ -261,35 +682,63 @@ class AnimeSyncManager:
         sync_start = datetime.utcnow()
         sync_id = f"sync_{int(sync_start.timestamp())}"
         
+        def report(fraction: float, message: str) -> None:
+            if progress_callback:
+                progress_callback(fraction, message)
+        
         try:
-            logger.info(f"Starting sync with direction: {direction.value}")
+            logger.info(f"Starting sync with direction: {direction.label}")
+            report(0.1, "Fetching your anime lists...")
+            
+            # Every direction compares both lists: the source says what to write, the target what already
+            # exists. Fetch whichever weren't supplied concurrently; they are independent requests to different hosts
+            anilist_future = _FETCH_POOL.submit(self.fetch_list, "anilist") if anilist_list is None else None
+            mal_future = _FETCH_POOL.submit(self.fetch_list, "mal") if mal_list is None else None
             
             # Get AniList list if needed
-            anilist_list = None
-            if direction in [SyncDirection.MAL_TO_ANILIST, SyncDirection.BIDIRECTIONAL]:
+            if anilist_future:
                 try:
-                    anilist_list = self.anilist_client.get_user_list()
+                    anilist_list = anilist_future.result()
                     logger.info(f"Fetched {len(anilist_list.anime_list) if anilist_list else 0} entries from AniList")
                 except Exception as e:
                     logger.error(f"Failed to fetch AniList list: {str(e)}")
-                    if direction == SyncDirection.MAL_TO_ANILIST:
+                    if direction != SyncDirection.BIDIRECTIONAL:
                         raise Exception(f"Failed to fetch AniList list: {str(e)}")
             
             # Get MAL list if needed
-            mal_list = None
-            if direction in [SyncDirection.ANILIST_TO_MAL, SyncDirection.BIDIRECTIONAL]:
+            if mal_future:
                 try:
-                    mal_list = self.mal_client.get_user_list()
+                    mal_list = mal_future.result()
                     logger.info(f"Fetched {len(mal_list.anime_list) if mal_list else 0} entries from MAL")
                 except Exception as e:
                     logger.error(f"Failed to fetch MAL list: {str(e)}")
-                    if direction == SyncDirection.ANILIST_TO_MAL:
+                    if direction != SyncDirection.BIDIRECTIONAL:
                         raise Exception(f"Failed to fetch MAL list: {str(e)}")
             
             if not mal_list and not anilist_list:
                 raise Exception("Failed to fetch lists from both MAL and AniList")
             
+            # Identical lists to a sync that had nothing to write will have nothing to write again
+            list_hash = self._hash_lists(mal_list, anilist_list, direction)
+            staged = self.sync_staging.get(config.target_platform)
+            if staged and staged.get("list_hash") == list_hash:
+                logger.info("Lists unchanged since the last sync with nothing to write; skipping")
+                report(1.0, "Your lists are already in sync")
+                return SyncResult(
+                    intersection=staged["comparison"].get("intersection", []),
+                    differences={
+                        "mal_only": staged["comparison"].get("mal_only", []),
+                        "anilist_only": staged["comparison"].get("anilist_only", [])
+                    },
+                    success_count=0,
+                    error_count=0,
+                    errors=[],
+                    sync_id=sync_id,
+                    timestamp=datetime.utcnow().isoformat()
+                )
+            
             # Compare lists if both were fetched
+            report(0.3, "Comparing lists...")
             comparison = self._compare_lists(
                 mal_list or PlatformList(username=config.mal_username, anime_list=[]), 
                 anilist_list or PlatformList(username=config.anilist_username, anime_list=[])
@@ -297,25 +746,42 @@ class AnimeSyncManager:
             
             # Determine which entries to sync based on direction
             sync_results = {}
+            to_mal = list(comparison["anilist_only"]) if direction & SyncDirection.ANILIST_TO_MAL and mal_list else []
+            to_anilist = list(comparison["mal_only"]) if direction & SyncDirection.MAL_TO_ANILIST and anilist_list else []
+            mal_updates, anilist_updates = self._plan_updates(comparison["changed"], direction)
+            to_mal.extend(mal_updates)
+            to_anilist.extend(anilist_updates)
+            total_writes = len(to_mal) + len(to_anilist)
+            written = 0
+            
+            def entry_done() -> None:
+                nonlocal written
+                written += 1
+                report(0.3 + 0.7 * written / total_writes, f"Syncing your lists ({written}/{total_writes})...")
+            
+            # The two directions write disjoint entries to different platforms, so they run side by side
+            jobs = {}
             
             # Sync from AniList to MAL
-            if direction in [SyncDirection.ANILIST_TO_MAL, SyncDirection.BIDIRECTIONAL] and mal_list:
-                entries_to_sync = comparison["anilist_only"]
-                if entries_to_sync:
-                    logger.info(f"Syncing {len(entries_to_sync)} entries from AniList to MAL")
-                    sync_results["to_mal"] = self._sync_to_mal(config.mal_username, entries_to_sync)
+            if direction & SyncDirection.ANILIST_TO_MAL and mal_list:
+                if to_mal:
+                    logger.info(f"Syncing {len(to_mal)} entries from AniList to MAL")
+                    jobs["to_mal"] = lambda done: self._sync_to_mal(config.mal_username, to_mal, done,
+                                                                      config.max_concurrency)
                 else:
                     logger.info("No entries to sync from AniList to MAL")
             
             # Sync from MAL to AniList
-            if direction in [SyncDirection.MAL_TO_ANILIST, SyncDirection.BIDIRECTIONAL] and anilist_list:
-                entries_to_sync = comparison["mal_only"]
-                if entries_to_sync:
-                    logger.info(f"Syncing {len(entries_to_sync)} entries from MAL to AniList")
-                    sync_results["to_anilist"] = self._sync_to_anilist(config.anilist_username, entries_to_sync)
+            if direction & SyncDirection.MAL_TO_ANILIST and anilist_list:
+                if to_anilist:
+                    logger.info(f"Syncing {len(to_anilist)} entries from MAL to AniList")
+                    jobs["to_anilist"] = lambda done: self._sync_to_anilist(config.anilist_username, to_anilist, done,
+                                                                              config.max_concurrency)
                 else:
                     logger.info("No entries to sync from MAL to AniList")
             
+            sync_results.update(self._run_directions(jobs, entry_done))
+            
             # Prepare sync result
             success_count = sum(r.get('success', 0) for r in sync_results.values())
             errors = []
@@ -325,24 +791,21 @@ class AnimeSyncManager:
             # Store sync history
             sync_end = datetime.utcnow()
             sync_duration = (sync_end - sync_start).total_seconds()
+            end_iso = sync_end.isoformat()
             
             sync_entry = {
                 "id": sync_id,
                 "start_time": sync_start.isoformat(),
-                "end_time": sync_end.isoformat(),
+                "end_time": end_iso,
                 "duration_seconds": sync_duration,
-                "direction": direction.value,
+                "direction": direction.label,
                 "success_count": success_count,
                 "error_count": len(errors),
                 "errors": errors,
-                "config": config.dict()
+                "config": config.model_dump()
             }
             self.sync_history.append(sync_entry)
             
-            # Keep only the last 100 syncs in history
-            if len(self.sync_history) > 100:
-                self.sync_history = self.sync_history[-100:]
-            
             # Store staging data
             self.sync_staging[config.target_platform] = {
                 "mal_list": mal_list,
@@ -350,7 +813,9 @@ class AnimeSyncManager:
                 "comparison": comparison,
                 "sync_result": sync_results,
                 "sync_id": sync_id,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": end_iso,
+                # Only a run that had nothing to write may be skipped next time
+                "list_hash": list_hash if total_writes == 0 else None
             }
             
             logger.info(f"Sync completed in {sync_duration:.2f} seconds with {success_count} successes and {len(errors)} errors")
@@ -359,25 +824,56 @@ class AnimeSyncManager:
                 intersection=comparison.get("intersection", []),
                 differences={
                     "mal_only": comparison.get("mal_only", []),
-                    "anilist_only": comparison.get("anilist_only", [])
+                    "anilist_only": comparison.get("anilist_only", []),
+                    "mal_updates": mal_updates,
+                    "anilist_updates": anilist_updates
                 },
                 success_count=success_count,
                 error_count=len(errors),
                 errors=errors,
                 sync_id=sync_id,
-                timestamp=datetime.utcnow().isoformat()
+                timestamp=end_iso
             )
 
         except Exception as e:
             logger.error(f"Sync failed: {str(e)}", exc_info=True)
             raise Exception(f"Sync failed: {str(e)}")
 
-    def sync_from_json(self, json_data: List[Dict], config: SyncConfig) -> SyncResult:
+    @staticmethod
+    def _json_id(value: Any) -> Optional[int]:
+        """Read a platform id from an export's mal/al field, which may be a number, a string or empty."""
+        text = str(value).strip()
+        return int(text) if text.isdigit() else None
+
+    @staticmethod
+    def _validate_entries(items: List[Dict[str, Any]]) -> List[AnimeEntry]:
+        """
+        Validate normalized JSON items into AnimeEntry objects in a single pydantic pass.
+        
+        Items that fail validation are logged and dropped; the rest are kept.
+        
+        Args:
+            items: Dicts with AnimeEntry's field names
+            
+        Returns:
+            List[AnimeEntry]: The valid entries, in input order
+        """
+        try:
+            return _ENTRY_LIST_ADAPTER.validate_python(items)
+        except ValidationError as e:
+            bad = {error["loc"][0] for error in e.errors() if error.get("loc")}
+            for index in sorted(bad):
+                logger.error("Error processing JSON entry %s: invalid field values", items[index])
+            return _ENTRY_LIST_ADAPTER.validate_python([item for i, item in enumerate(items) if i not in bad])
+
+    def sync_from_json(self, json_data: Union[Iterable[Dict], bytes, BinaryIO], config: SyncConfig) -> SyncResult:
         """
         Sync anime entries from JSON data with the user's structure.
         
         Args:
-            json_data: List of dictionaries containing anime data
+            json_data: Iterable of dictionaries containing anime data, raw JSON bytes
+                (decoded with orjson), or a binary file holding a top-level JSON array,
+                which is streamed without being loaded whole
             config: Sync configuration including target platform
             
         Returns:
@@ -390,54 +886,58 @@ class AnimeSyncManager:
         sync_id = f"json_import_{int(sync_start.timestamp())}"
         
         try:
-            logger.info(f"Starting JSON import for {len(json_data)} entries to {config.target_platform}")
-            
-            # Convert JSON data to AnimeEntry objects
-            entries = []
-            for item in json_data:
-                try:
-                    # Handle different JSON structures
-                    if "name" in item and "mal" in item and "al" in item:
-                        # New format with name, mal, al fields
-                        entry = JSONAnimeEntry(
-                            name=item["name"],
-                            mal=item["mal"],
-                            al=item["al"]
-                        )
-                        title = entry.name
-                    elif "title" in item:
-                        # Direct AnimeEntry-like format
-                        title = item["title"]
-                    else:
-                        logger.warning(f"Skipping invalid JSON entry: {item}")
-                        continue
-                        
-                    entries.append(AnimeEntry(
-                        title=title,
-                        status=item.get("status", "planning"),
-                        score=item.get("score"),
-                        episodes_watched=item.get("episodes_watched", 0),
-                        total_episodes=item.get("total_episodes")
-                    ))
-                except Exception as e:
-                    logger.error(f"Error processing JSON entry {item}: {str(e)}")
+            logger.info(f"Starting JSON import to {config.target_platform}")
+            
+            # Stream file input item by item so memory stays flat for large exports
+            if isinstance(json_data, (bytes, bytearray, memoryview)):
+                items = orjson.loads(json_data)
+            elif hasattr(json_data, "read"):
+                items = ijson.items(json_data, "item", use_float=True)
+            else:
+                items = json_data
+            
+            # Normalize both supported shapes in one pass: {name, mal, al} exports and AnimeEntry-like dicts
+            normalized = []
+            for item in items:
+                if "name" in item and "mal" in item and "al" in item:
+                    title = item["name"]
+                    mal_id, anilist_id = self._json_id(item["mal"]), self._json_id(item["al"])
+                elif "title" in item:
+                    title = item["title"]
+                    mal_id, anilist_id = item.get("mal_id"), item.get("anilist_id")
+                else:
+                    logger.warning("Skipping invalid JSON entry: %s", item)
+                    continue
+                normalized.append({
+                    "title": title,
+                    "status": item.get("status", "planning"),
+                    "score": item.get("score"),
+                    "episodes_watched": item.get("episodes_watched", 0),
+                    "total_episodes": item.get("total_episodes"),
+                    "mal_id": mal_id,
+                    "anilist_id": anilist_id,
+                })
+            
+            entries = self._validate_entries(normalized)
             
             logger.info(f"Processed {len(entries)} valid entries from JSON")
             
             # Sync based on target platform
             if config.target_platform.lower() == "myanimelist":
-                result = self._sync_to_mal(config.mal_username, entries)
+                result = self._sync_to_mal(config.mal_username, entries, max_concurrency=config.max_concurrency)
             else:  # AniList
-                result = self._sync_to_anilist(config.anilist_username, entries)
+                result = self._sync_to_anilist(config.anilist_username, entries,
+                                               max_concurrency=config.max_concurrency)
             
             sync_end = datetime.utcnow()
+            end_iso = sync_end.isoformat()
             
             # Store sync history
             sync_entry = {
                 "id": sync_id,
                 "type": "json_import",
                 "start_time": sync_start.isoformat(),
-                "end_time": sync_end.isoformat(),
+                "end_time": end_iso,
                 "duration_seconds": (sync_end - sync_start).total_seconds(),
                 "target_platform": config.target_platform,
                 "entries_processed": len(entries),
@@ -447,10 +947,6 @@ class AnimeSyncManager:
             }
             self.sync_history.append(sync_entry)
             
-            # Keep only the last 100 syncs in history
-            if len(self.sync_history) > 100:
-                self.sync_history = self.sync_history[-100:]
-            
             logger.info(f"JSON import completed: {result.get('success', 0)} succeeded, "
                        f"{len(result.get('errors', []))} failed")
             
@@ -461,7 +957,7 @@ class AnimeSyncManager:
                 error_count=len(result.get("errors", [])),
                 errors=result.get("errors", []),
                 sync_id=sync_id,
-                timestamp=datetime.utcnow().isoformat()
+                timestamp=end_iso
             )
 
         except Exception as e:
@@ -4,13 +4,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from typing import Dict, Optional
+from typing import Dict
+from cachetools import TTLCache
+import asyncio
 import os
+import re
 import logging
 from starlette.middleware.sessions import SessionMiddleware
 from urllib.parse import urlparse, parse_qs
 
-from .oauth_service import get_authorization_url, exchange_code_for_token
+from .oauth_service import FRONTEND_BASE_URL, get_authorization_url, exchange_code_for_token
 
 app = FastAPI(
     title="Anime List Sync API",
@@ -18,13 +21,22 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# CORS middleware to allow requests from the frontend
+# Origins allowed to call the API from a browser: CORS_ORIGINS (comma-separated), else the frontend
+CORS_ORIGINS = [
+    origin.strip().rstrip("/")
+    for origin in os.getenv("CORS_ORIGINS", f"{FRONTEND_BASE_URL},http://localhost:8501").split(",")
+    if origin.strip()
+]
+
+# CORS middleware to allow requests from the frontend. Concrete lists rather than wildcards:
+# a wildcard origin with credentials makes Starlette echo back whatever origin asked, and
+# an explicit origin is answered with a set lookup
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with your frontend URL
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
 # Session middleware for request.session support
@@ -33,22 +45,18 @@ app.add_middleware(
     secret_key=os.getenv("SESSION_SECRET", "dev-secret"),
 )
 
-# Store tokens in memory (in production, use a secure session store or database)
-user_sessions: Dict[str, Dict] = {}
-
-# Store PKCE code_verifiers by OAuth state to support frontend-based callbacks
-STATE_STORE: Dict[str, Dict[str, str]] = {}
+# Seconds an OAuth flow may take before its state is forgotten, and a session may live at all
+OAUTH_STATE_TTL = 600
+SESSION_TTL = int(os.getenv("SESSION_TTL", str(24 * 3600)))
 
-class AuthResponse(BaseModel):
-    success: bool
-    url: str
-    error: Optional[str] = None
+# Store tokens in memory (in production, use a secure session store or database);
+# bounded and expiring so abandoned sessions don't accumulate for the life of the process.
+# TTLCache expiry is absolute: a session ends SESSION_TTL seconds after it was created, however active
+user_sessions: "TTLCache[str, Dict]" = TTLCache(maxsize=10_000, ttl=SESSION_TTL)
 
-class CallbackResponse(BaseModel):
-    success: bool
-    token: Optional[Dict] = None
-    username: Optional[str] = None
-    error: Optional[str] = None
+# Store PKCE code_verifiers by OAuth state to support frontend-based callbacks;
+# flows that never reach the callback expire instead of leaking
+STATE_STORE: "TTLCache[str, Dict[str, str]]" = TTLCache(maxsize=10_000, ttl=OAUTH_STATE_TTL)
 
 router = APIRouter()
 
@@ -83,7 +91,8 @@ async def auth_callback(platform: str, code: str, state: str, request: Request):
     code_verifier = entry.get("code_verifier")
     
     try:
-        token_data = exchange_code_for_token(platform, code, code_verifier)
+        # The token request is blocking I/O; run it off the event loop so other requests keep being served
+        token_data = await asyncio.to_thread(exchange_code_for_token, platform, code, code_verifier)
         # Clean up state entry
         STATE_STORE.pop(state, None)
         # Redirect to frontend with success
@@ -110,7 +119,7 @@ async def exchange_token(body: TokenRequest):
         raise HTTPException(status_code=400, detail="Invalid or expired state")
     code_verifier = entry.get("code_verifier")
     try:
-        token_data = exchange_code_for_token(platform, body.code, code_verifier)
+        token_data = await asyncio.to_thread(exchange_code_for_token, platform, body.code, code_verifier)
         STATE_STORE.pop(body.state, None)
         return {"success": True, "platform": platform, "token": token_data}
     except Exception as e:
@@ -145,8 +154,27 @@ async def logout(request: Request):
     response.delete_cookie("session_id")
     return response
 
+# Build output with a content hash in its name, e.g. index.3f9a1c2e.js
+HASHED_ASSET = re.compile(r"\.[0-9a-f]{8,}\.(?:js|css|woff2?|png|jpe?g|svg|webp)$")
+
+class FrontendFiles(StaticFiles):
+    """StaticFiles that lets browsers keep hashed build assets and revalidate everything else.
+
+    A hashed file's name changes with its content, so it can be cached forever; index.html and
+    other unhashed files must be revalidated (cheap: StaticFiles answers with 304 from its ETag).
+    A reverse proxy in front of the API can serve frontend/dist directly with the same rules.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if HASHED_ASSET.search(str(full_path)):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
+
 # Mount static files for the frontend (optional during dev/CI)
 if os.path.isdir("frontend/dist"):
-    app.mount("/", StaticFiles(directory="frontend/dist", html=True), name="frontend")
+    app.mount("/", FrontendFiles(directory="frontend/dist", html=True), name="frontend")
 else:
     logging.getLogger(__name__).warning("Static directory 'frontend/dist' not found; skipping mount.")
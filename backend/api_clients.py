@@ -1,12 +1,22 @@
 import requests
-from typing import List, Dict, Optional, Any
+import orjson
+from typing import List, Dict, Optional, Any, Sequence, Tuple
 from .models import AnimeEntry, PlatformList
+import hashlib
+import random
 import time
 import os
+import threading
+import atexit
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from datetime import datetime
 from dotenv import load_dotenv
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from cachetools import LRUCache
 from fastapi import HTTPException
 
 # Load environment variables from credentials.env
@@ -15,27 +25,212 @@ if not loaded:
     root_env = Path(__file__).resolve().parents[1] / 'credentials.env'
     load_dotenv(root_env)
 
+# Connections kept alive per platform
+POOL_SIZE = 20
+# (connect, read) seconds for requests that don't set their own timeout
+DEFAULT_TIMEOUT = (5.0, 30.0)
+# 429 responses a session re-sends before handing the error to the caller, and the cap on
+# its backoff when the server gives no Retry-After
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_MAX_DELAY = 30.0
+# Title lookups remembered per platform; ids never change, so entries only age out by LRU
+ID_CACHE_SIZE = 10_000
+# Revalidatable full-list responses remembered per client (MAL pages of up to 1000 entries, AniList lists)
+LIST_CACHE_SIZE = 8
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` requests per `period` seconds."""
+
+    def __init__(self, rate: float, period: float = 1.0):
+        self.capacity = rate
+        self.fill_rate = rate / period
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+        self.updated = now
+
+    def acquire(self) -> None:
+        """Take one token, sleeping only while the bucket is empty."""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
+    def observe(self, remaining: Optional[float] = None, retry_after: Optional[float] = None) -> None:
+        """Align the bucket with the server's view of the quota.
+
+        `remaining` caps the tokens at what the server says is left; `retry_after` drives the
+        bucket negative so every caller waits out the server's back-off, not just the one that got it.
+        """
+        with self.lock:
+            self._refill()
+            if remaining is not None:
+                self.tokens = min(self.tokens, remaining)
+            if retry_after:
+                self.tokens = min(self.tokens, -retry_after * self.fill_rate)
+
+def _header_seconds(headers, name: str) -> Optional[float]:
+    """Read a numeric header such as Retry-After; None if it's absent or not a number."""
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+class RateLimitedSession(requests.Session):
+    """requests.Session that takes a token from a shared bucket before each request.
+
+    The bucket is corrected from each response's X-RateLimit-Remaining and, on a 429,
+    Retry-After header (or a full-jitter exponential delay when there is none), then the
+    request is re-sent up to RATE_LIMIT_RETRIES times. Because the back-off lives in the
+    shared bucket, every thread waits it out and resumes one token at a time rather than
+    all retrying in the same second. Requests without an explicit timeout get
+    DEFAULT_TIMEOUT, so a stalled connection can't hold a pooled connection and a write
+    slot indefinitely.
+    """
+
+    def __init__(self, limiter: Optional[TokenBucket] = None):
+        super().__init__()
+        self.limiter = limiter
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+        attempt = 0
+        while True:
+            if self.limiter:
+                self.limiter.acquire()
+            response = super().request(*args, **kwargs)
+            retry_after = None
+            if response.status_code == 429:
+                retry_after = _header_seconds(response.headers, 'Retry-After')
+                if retry_after is None:
+                    retry_after = random.uniform(0, min(RATE_LIMIT_MAX_DELAY, 2 ** attempt))
+            if self.limiter:
+                self.limiter.observe(_header_seconds(response.headers, 'X-RateLimit-Remaining'), retry_after)
+            if retry_after is None or attempt >= RATE_LIMIT_RETRIES:
+                return response
+            attempt += 1
+            if not self.limiter:
+                time.sleep(retry_after)
+
+class EntryUpdateError(Exception):
+    """A failed list write; the message, including the response body, is built only when shown.
+
+    Transient failures are retried and usually succeed, so formatting (and decoding the
+    error body) is deferred to str() instead of happening on every failed attempt.
+    """
+
+    def __init__(self, platform: str, title: str, error: requests.RequestException):
+        super().__init__(platform, title, error)
+        self.platform = platform
+        self.title = title
+        self.error = error
+
+    def __str__(self) -> str:
+        message = f"Failed to update {self.platform} entry for '{self.title}': {self.error}"
+        response = getattr(self.error, 'response', None)
+        if response is None:
+            return message
+        try:
+            error_data = response.json()
+        except ValueError:
+            return f"{message} - {response.text}"
+        if isinstance(error_data, dict) and 'errors' in error_data:
+            return f"{message} - {', '.join(err.get('message', 'Unknown error') for err in error_data['errors'])}"
+        if isinstance(error_data, dict) and 'message' in error_data:
+            return f"{message} - {error_data['message']}"
+        return f"{message} - {response.text}"
+
+class IdCache:
+    """Thread-safe LRU of search key -> platform id, shared by every client of a platform.
+
+    Titles are keyed case- and whitespace-insensitively, so "Monster " and "monster" cost
+    one lookup between them. Only hits are stored; a miss may be a transient search failure.
+    """
+
+    def __init__(self, maxsize: int = ID_CACHE_SIZE):
+        self._ids: "LRUCache[Any, int]" = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(key: Any) -> Any:
+        return key.strip().casefold() if isinstance(key, str) else key
+
+    def get(self, key: Any) -> Optional[int]:
+        with self._lock:
+            return self._ids.get(self._key(key))
+
+    def set(self, key: Any, value: Optional[int]) -> None:
+        if value:
+            with self._lock:
+                self._ids[self._key(key)] = value
+
+def _with_upper_keys(mapping: Dict[str, str]) -> Dict[str, str]:
+    """Add an uppercase twin of every key, so MAL ("watching") and AniList ("CURRENT") spellings both hit directly."""
+    return {**mapping, **{key.upper(): value for key, value in mapping.items()}}
+
 class BaseAPIClient:
+    # Shared by every client of a platform in this process; None disables limiting
+    rate_limiter: Optional[TokenBucket] = None
+    # Incoming status (either platform's spelling) -> this platform's value
+    STATUS_MAP: Dict[str, str] = {}
+    _adapter_lock = threading.Lock()
+
     def __init__(self):
-        self.session = requests.Session()
-        retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-        self.session.mount('http://', HTTPAdapter(max_retries=retries))
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        self.session = RateLimitedSession(self.rate_limiter)
+        adapter = self._shared_adapter()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.access_token = None
         self.username = None
 
+    @classmethod
+    def _shared_adapter(cls) -> HTTPAdapter:
+        """Return the platform's keep-alive pool, creating it on first use.
+
+        Clients are rebuilt whenever a token changes; sharing the adapter per platform keeps
+        open connections (and their TLS sessions) instead of handshaking again for each client.
+        """
+        with BaseAPIClient._adapter_lock:
+            adapter = cls.__dict__.get('_adapter')
+            if adapter is None:
+                # 429s are left to RateLimitedSession so the shared bucket sees them; a retry inside
+                # the adapter would hide them from every other thread. urllib3 retries any 413/429/503
+                # carrying Retry-After even outside status_forcelist, so that has to be switched off too.
+                # 5xx retries here cover reads only: writes are retried by AnimeSyncManager, which needs
+                # the final response (raise_on_status=False) to see its status and Retry-After
+                retries = Retry(total=3, backoff_factor=0.5, backoff_jitter=0.5, status_forcelist=[500, 502, 503, 504],
+                                allowed_methods=frozenset({'GET', 'HEAD'}), raise_on_status=False,
+                                respect_retry_after_header=False)
+                # Sized for the sync manager's concurrent writers
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retries)
+                cls._adapter = adapter
+                atexit.register(adapter.close)
+            return adapter
+
+    def close(self):
+        """Close the pooled HTTP connections, which are shared by every client of this platform."""
+        self.session.close()
+
     def set_credentials(self, access_token: str, username: str = None):
         """Set the access token and optionally the username for authenticated requests."""
         self.access_token = access_token
         if username:
             self.username = username
 
-    def _handle_rate_limit(self, response):
-        if response.status_code == 429:
-            retry_after = int(response.headers.get('Retry-After', 1))
-            time.sleep(retry_after)
-            return True
-        return False
+    def _map_status(self, status: Optional[str], default: Optional[str] = None) -> Optional[str]:
+        """Translate a status; the usual spellings are one dict probe, anything else is lowercased first."""
+        if not status:
+            return None
+        mapped = self.STATUS_MAP.get(status)
+        return mapped if mapped is not None else self.STATUS_MAP.get(status.lower(), default)
 
     def _ensure_authenticated(self):
         """Ensure the client is properly authenticated."""
@@ -43,12 +238,37 @@ class BaseAPIClient:
             raise HTTPException(status_code=401, detail="Not authenticated. Please log in first.")
 
 class MALClient(BaseAPIClient):
+    # Map status (MAL or AniList spelling) to MAL's expected values
+    STATUS_MAP = _with_upper_keys({
+        'watching': 'watching',
+        'completed': 'completed',
+        'on_hold': 'on_hold',
+        'dropped': 'dropped',
+        'plan_to_watch': 'plan_to_watch',
+        'planning': 'plan_to_watch',
+        'current': 'watching',
+        'paused': 'on_hold',
+        'repeating': 'watching'
+    })
+
+    # MAL doesn't publish a limit; ~2 requests/second stays clear of its throttling
+    rate_limiter = TokenBucket(float(os.getenv('MAL_REQUESTS_PER_SECOND', '2')), 1.0)
+    # List pages requested at once when a full list spans more than one page
+    LIST_PAGE_FANOUT = 3
+    # Title -> MAL anime id, so retried, repeated and re-imported writes skip the search request
+    anime_ids = IdCache()
+
     def __init__(self, access_token: str = None):
         super().__init__()
         # Default to env token/username if not provided
         self.access_token = access_token or os.getenv('MAL_ACCESS_TOKEN')
         self.username = os.getenv('MAL_USERNAME') or self.username
         self.base_url = "https://api.myanimelist.net/v2"
+        # Page URL -> (ETag, entries, next URL) of full-list pages, revalidated with If-None-Match.
+        # The entries are the same frozen objects handed to callers, so a hit costs no extra copy
+        self._list_pages: "LRUCache[str, Tuple[str, Tuple[AnimeEntry, ...], Optional[str]]]" = LRUCache(maxsize=LIST_CACHE_SIZE)
+        # LRUCache reorders itself on every get, and the fan-out threads read and write it at once
+        self._list_pages_lock = threading.Lock()
         self.client_id = os.getenv('MAL_CLIENT_ID')
         if not self.client_id:
             raise ValueError("MAL_CLIENT_ID not found in environment variables")
@@ -60,12 +280,13 @@ class MALClient(BaseAPIClient):
             "X-MAL-CLIENT-ID": self.client_id
         }
 
-    def get_user_list(self, username: str = None) -> PlatformList:
+    def get_user_list(self, username: str = None, since: Optional[int] = None) -> PlatformList:
         """
         Get the user's anime list.
         
         Args:
             username: The MAL username. If not provided, uses the authenticated user's username.
+            since: Optional epoch seconds; only entries updated at or after this are returned.
             
         Returns:
             PlatformList containing the user's anime entries
@@ -83,49 +304,109 @@ class MALClient(BaseAPIClient):
             'limit': 1000,  # Increased limit to get all entries in one request
             'nsfw': 'true'  # Include NSFW content
         }
-        
-        anime_entries: List[AnimeEntry] = []
-        next_url: Optional[str] = url
-        next_params: Optional[Dict] = params
-
-        while next_url:
-            response = self.session.get(next_url, params=next_params, headers=self.get_headers())
-            if self._handle_rate_limit(response):
-                # try again after waiting
-                time.sleep(1)
-                continue
-            try:
-                response.raise_for_status()
-            except requests.HTTPError as e:
-                # Include response text for easier debugging
-                raise requests.HTTPError(f"{e} - {response.text}")
-
-            data = response.json()
-
-            for node in data.get('data', []):
-                anime = node.get('node', {})
-                list_status = node.get('list_status', {}) or {}
-                score_val = list_status.get('score')
-                anime_entries.append(AnimeEntry(
-                    title=anime.get('title', 'Unknown'),
-                    status=list_status.get('status', 'unknown'),
-                    score=(int(score_val) if isinstance(score_val, (int, float)) else None),
-                    episodes_watched=list_status.get('num_episodes_watched'),
-                    total_episodes=anime.get('num_episodes')
-                ))
-
-            paging = data.get('paging', {})
-            next_full = paging.get('next')
-            if next_full:
+        if since is not None:
+            # Newest changes first, so paging can stop at the first entry older than since.
+            # Serial on purpose for the same reason
+            params['sort'] = 'list_updated_at'
+            anime_entries: List[AnimeEntry] = []
+            next_url: Optional[str] = url
+            next_params: Optional[Dict] = params
+            while next_url:
+                page_entries, reached_since, next_full = self._get_list_page(next_url, next_params, since=since)
+                anime_entries.extend(page_entries)
                 # When using the provided 'next' URL, don't pass params again
-                next_url = next_full
-                next_params = None
-            else:
-                next_url = None
+                next_url, next_params = (next_full, None) if next_full and not reached_since else (None, None)
+            return PlatformList(username=username, anime_list=anime_entries)
+
+        page_entries, _, next_full = self._get_list_page(url, params, revalidate=True)
+        anime_entries = list(page_entries)
+        if next_full:
+            # MAL doesn't report the list size, so later pages are requested by offset, speculatively.
+            # The window starts at one page and grows by one per page that links a next, up to
+            # LIST_PAGE_FANOUT, so a list ending on its second page costs no request past the end and
+            # longer lists at most LIST_PAGE_FANOUT - 1. Pages are consumed in order; the first one
+            # without a next link stops scheduling and cancels whatever has not started yet
+            limit = params['limit']
+            fetch_page = lambda page_offset: self._get_list_page(url, {**params, 'offset': page_offset}, revalidate=True)
+            offsets = itertools.count(limit, limit)
+            with ThreadPoolExecutor(max_workers=self.LIST_PAGE_FANOUT) as executor:
+                pending = deque([executor.submit(fetch_page, next(offsets))])
+                while pending:
+                    page_entries, _, next_full = pending.popleft().result()
+                    anime_entries.extend(page_entries)
+                    if not next_full:
+                        for future in pending:
+                            future.cancel()
+                        break
+                    for _ in range(min(2, self.LIST_PAGE_FANOUT - len(pending))):
+                        pending.append(executor.submit(fetch_page, next(offsets)))
 
         return PlatformList(username=username, anime_list=anime_entries)
 
+    def _get_list_page(self, url: str, params: Optional[Dict], since: Optional[int] = None,
+                       revalidate: bool = False) -> Tuple[Sequence[AnimeEntry], bool, Optional[str]]:
+        """
+        GET and parse one animelist page.
+        
+        With revalidate, the page is requested with the ETag it last came with, if the server sent
+        one, and a 304 reuses the entries parsed then. Nothing is stored for responses without an ETag.
+        
+        Returns:
+            The page's entries, whether an entry older than since was reached, and the next page URL
+        """
+        # Delta fetches change every time; only full-list pages are worth revalidating
+        page_key = requests.Request('GET', url, params=params).prepare().url if revalidate else None
+        with self._list_pages_lock:
+            cached = self._list_pages.get(page_key) if page_key else None
+        headers = self.get_headers()
+        if cached:
+            headers['If-None-Match'] = cached[0]
+        response = self.session.get(url, params=params, headers=headers)
+        if cached and response.status_code == 304:
+            return cached[1], False, cached[2]
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            # Include response text for easier debugging
+            raise requests.HTTPError(f"{e} - {response.text}")
+
+        # List pages run to megabytes; orjson decodes them several times faster than requests' stdlib json
+        data = orjson.loads(response.content)
+        anime_entries, reached_since = self._parse_list_page(data, since)
+        next_url = (data.get('paging') or {}).get('next')
+        etag = response.headers.get('ETag')
+        if page_key and etag:
+            with self._list_pages_lock:
+                self._list_pages[page_key] = (etag, tuple(anime_entries), next_url)
+        return anime_entries, reached_since, next_url
+
+    def _parse_list_page(self, data: Dict, since: Optional[int] = None) -> Tuple[List[AnimeEntry], bool]:
+        """Build entries from one animelist page; the flag is set once an entry older than since is reached."""
+        anime_entries: List[AnimeEntry] = []
+        for node in data.get('data', []):
+            anime = node.get('node', {})
+            list_status = node.get('list_status', {}) or {}
+            score_val = list_status.get('score')
+            updated_at = list_status.get('updated_at')
+            updated_at = int(datetime.fromisoformat(updated_at).timestamp()) if updated_at else None
+            # Inclusive, so an edit in the same second as the newest known one isn't missed
+            if since is not None and updated_at is not None and updated_at < since:
+                return anime_entries, True
+            anime_entries.append(AnimeEntry(
+                title=anime.get('title', 'Unknown'),
+                status=list_status.get('status', 'unknown'),
+                score=(int(score_val) if isinstance(score_val, (int, float)) else None),
+                episodes_watched=list_status.get('num_episodes_watched'),
+                total_episodes=anime.get('num_episodes'),
+                updated_at=updated_at,
+                mal_id=anime.get('id')
+            ))
+        return anime_entries, False
+
     def search_anime_id(self, title: str) -> Optional[int]:
+        cached = self.anime_ids.get(title)
+        if cached is not None:
+            return cached
         url = f"{self.base_url}/anime"
         params = {
             "q": title,
@@ -137,13 +418,16 @@ class MALClient(BaseAPIClient):
         first = (data.get('data') or [])
         if not first:
             return None
-        return first[0].get('node', {}).get('id')
+        anime_id = first[0].get('node', {}).get('id')
+        self.anime_ids.set(title, anime_id)
+        return anime_id
 
     # Backwards-compatible alias used by tests
     def search_media_id(self, title: str) -> Optional[int]:
         return self.search_anime_id(title)
 
-    def save_list_entry(self, title: str, status: Optional[str], score: Optional[int], progress: Optional[int]) -> bool:
+    def save_list_entry(self, title: str, status: Optional[str], score: Optional[int], progress: Optional[int],
+                        anime_id: Optional[int] = None) -> bool:
         """
         Save or update an anime entry in the user's MyAnimeList.
         
@@ -152,6 +436,7 @@ class MALClient(BaseAPIClient):
             status: Watching status (watching, completed, on_hold, dropped, plan_to_watch)
             score: User's score (0-10)
             progress: Number of episodes watched
+            anime_id: MAL anime id if already known, which skips the title search
             
         Returns:
             bool: True if successful
@@ -163,32 +448,19 @@ class MALClient(BaseAPIClient):
         if not self.access_token:
             raise ValueError("MAL access token is required for write operations. Set MAL_ACCESS_TOKEN in credentials.env")
             
-        anime_id = self.search_anime_id(title)
-        if not anime_id:
-            raise Exception(f"MAL anime not found for title: {title}")
-            
-        # MAL API requires at least one field to be updated
+        # MAL API requires at least one field to be updated; checked before spending a search request
         if status is None and score is None and progress is None:
             raise ValueError("At least one of status, score, or progress must be provided")
             
+        anime_id = anime_id or self.search_anime_id(title)
+        if not anime_id:
+            raise Exception(f"MAL anime not found for title: {title}")
+            
         url = f"{self.base_url}/anime/{anime_id}/my_list_status"
         data = {}
         
-        # Map status to MAL's expected values
-        status_map = {
-            'watching': 'watching',
-            'completed': 'completed',
-            'on_hold': 'on_hold',
-            'dropped': 'dropped',
-            'plan_to_watch': 'plan_to_watch',
-            'planning': 'plan_to_watch',
-            'current': 'watching',
-            'paused': 'on_hold'
-        }
-        
         if status:
-            normalized_status = status.lower()
-            data["status"] = status_map.get(normalized_status, status)
+            data["status"] = self._map_status(status, status)
             
         if isinstance(score, (int, float)):
             # MAL expects integer 0-10
@@ -209,29 +481,45 @@ class MALClient(BaseAPIClient):
             resp.raise_for_status()
             return True
         except requests.HTTPError as e:
-            error_msg = f"Failed to update MAL entry for '{title}': {str(e)}"
-            if hasattr(e, 'response') and e.response is not None:
-                try:
-                    error_data = e.response.json()
-                    error_msg += f" - {error_data.get('message', 'No error details')}"
-                except:
-                    error_msg += f" - {e.response.text}"
-            raise Exception(error_msg) from e
+            raise EntryUpdateError("MAL", title, e) from e
 
 class AniListClient(BaseAPIClient):
+    # AniList allows 90 requests per minute
+    rate_limiter = TokenBucket(float(os.getenv('ANILIST_REQUESTS_PER_MINUTE', '90')), 60.0)
+    # Title, or ('mal', idMal), -> AniList media id
+    media_ids = IdCache()
+
+    # Map status (MAL or AniList spelling) to AniList's expected values
+    STATUS_MAP = _with_upper_keys({
+        'watching': 'CURRENT',
+        'completed': 'COMPLETED',
+        'on_hold': 'PAUSED',
+        'dropped': 'DROPPED',
+        'plan_to_watch': 'PLANNING',
+        'planning': 'PLANNING',
+        'current': 'CURRENT',
+        'paused': 'PAUSED',
+        'repeating': 'REPEATING'
+    })
+
     def __init__(self, access_token: str = None):
         super().__init__()
         # Default to env token/username if not provided
         self.access_token = access_token or os.getenv('ANILIST_ACCESS_TOKEN')
         self.username = os.getenv('ANILIST_USERNAME') or self.username
         self.base_url = "https://graphql.anilist.co"
+        # Username -> (body digest, parsed entries) of the last full fetch, so an unchanged list isn't
+        # decoded and rebuilt. The body is still downloaded in full; only the parsing is saved
+        self._list_bodies: "LRUCache[Optional[str], Tuple[str, Tuple[AnimeEntry, ...]]]" = LRUCache(maxsize=LIST_CACHE_SIZE)
+        self._list_bodies_lock = threading.Lock()
         
-    def get_user_list(self, username: str = None) -> PlatformList:
+    def get_user_list(self, username: str = None, since: Optional[int] = None) -> PlatformList:
         """
         Get the user's anime list.
         
         Args:
             username: The AniList username. If not provided, uses the authenticated user's list.
+            since: Optional epoch seconds; only entries updated at or after this are returned.
             
         Returns:
             PlatformList containing the user's anime entries
@@ -240,83 +528,27 @@ class AniListClient(BaseAPIClient):
         
         if not username and self.username:
             username = self.username
+        
+        if since is not None:
+            return self._get_updated_entries(username, since)
             
         query = """
         query ($username: String, $page: Int, $perPage: Int) {
             MediaListCollection(userName: $username, type: ANIME, sort: [MEDIA_TITLE_ENGLISH], page: $page, perPage: $perPage) {
                 lists {
-                    name
-                    isCustomList
-                    isCompletedList: isSplitCompletedList
                     entries {
-                        id
                         status
-                        score
+                        score(format: POINT_10)  # MAL's 0-10 scale, whatever the user's AniList format
                         progress
-                        repeat
-                        priority
-                        private
-                        notes
-                        hiddenFromStatusLists
-                        customLists
-                        advancedScores
-                        startedAt { year month day }
-                        completedAt { year month day }
                         updatedAt
-                        createdAt
                         media {
                             id
                             idMal
-                            title {
-                                romaji
-                                english
-                                native
-                                userPreferred
-                            }
-                            type
-                            format
-                            status
-                            description(asHtml: false)
-                            startDate { year month day }
-                            endDate { year month day }
-                            season
                             episodes
-                            duration
-                            chapters
-                            volumes
-                            countryOfOrigin
-                            isLicensed
-                            source
-                            hashtag
-                            trailer { id site thumbnail }
-                            updatedAt
-                            coverImage { extraLarge large medium color }
-                            bannerImage
-                            genres
-                            synonyms
-                            averageScore
-                            meanScore
-                            popularity
-                            trending
-                            favourites
-                            isAdult
-                            isFavourite
-                            nextAiringEpisode { airingAt timeUntilAiring episode }
-                            siteUrl
+                            title { romaji }
                         }
                     }
                 }
-                user {
-                    id
-                    name
-                    about
-                    avatar { large medium }
-                    bannerImage
-                    isFollowing
-                    isFollower
-                    isBlocked
-                    bans
-                }
             }
         }
         """
@@ -339,11 +571,15 @@ class AniListClient(BaseAPIClient):
             headers=headers
         )
         
-        if self._handle_rate_limit(response):
-            return self.get_user_list(username)
-        
         response.raise_for_status()
-        data = response.json()
+        # GraphQL has no ETag to revalidate against; an identical body means an unchanged list.
+        # Entries are frozen, but each caller gets its own PlatformList and list around them
+        digest = hashlib.sha256(response.content).hexdigest()
+        with self._list_bodies_lock:
+            cached = self._list_bodies.get(username)
+        if cached and cached[0] == digest:
+            return PlatformList(username=username, anime_list=list(cached[1]))
+        data = orjson.loads(response.content)
 
         # Handle GraphQL errors gracefully
         if isinstance(data, dict) and data.get('errors'):
@@ -361,17 +597,80 @@ class AniListClient(BaseAPIClient):
                     status=entry.get('status', 'UNKNOWN'),
                     score=(int(score_val) if isinstance(score_val, (int, float)) else None),
                     episodes_watched=entry.get('progress'),
-                    total_episodes=(entry.get('media') or {}).get('episodes')
+                    total_episodes=(entry.get('media') or {}).get('episodes'),
+                    updated_at=entry.get('updatedAt'),
+                    mal_id=(entry.get('media') or {}).get('idMal'),
+                    anilist_id=(entry.get('media') or {}).get('id')
                 ))
 
+        with self._list_bodies_lock:
+            self._list_bodies[username] = (digest, tuple(anime_entries))
         return PlatformList(username=username, anime_list=anime_entries)
 
+    def _get_updated_entries(self, username: Optional[str], since: int) -> PlatformList:
+        """
+        Page through the user's entries newest-first, stopping at the first one updated before since.
+        
+        Args:
+            username: The AniList username
+            since: Epoch seconds of the newest change already known
+            
+        Returns:
+            PlatformList containing only the entries changed at or after since
+        """
+        query = """
+        query ($username: String, $page: Int) {
+            Page(page: $page, perPage: 50) {
+                pageInfo { hasNextPage }
+                mediaList(userName: $username, type: ANIME, sort: UPDATED_TIME_DESC) {
+                    status
+                    score(format: POINT_10)  # MAL's 0-10 scale, whatever the user's AniList format
+                    progress
+                    updatedAt
+                    media {
+                        id
+                        idMal
+                        episodes
+                        title { romaji }
+                    }
+                }
+            }
+        }
+        """
+        
+        anime_entries: List[AnimeEntry] = []
+        page = 1
+        while True:
+            data = self._post_graphql(query, {'username': username, 'page': page})['data']
+            result = data.get('Page') or {}
+            for entry in result.get('mediaList') or []:
+                # Inclusive, so an edit in the same second as the newest known one isn't missed
+                if (entry.get('updatedAt') or 0) < since:
+                    return PlatformList(username=username, anime_list=anime_entries)
+                score_val = entry.get('score')
+                anime_entries.append(AnimeEntry(
+                    title=((entry.get('media') or {}).get('title') or {}).get('romaji', 'Unknown'),
+                    status=entry.get('status', 'UNKNOWN'),
+                    score=(int(score_val) if isinstance(score_val, (int, float)) else None),
+                    episodes_watched=entry.get('progress'),
+                    total_episodes=(entry.get('media') or {}).get('episodes'),
+                    updated_at=entry.get('updatedAt'),
+                    mal_id=(entry.get('media') or {}).get('idMal'),
+                    anilist_id=(entry.get('media') or {}).get('id')
+                ))
+            if not (result.get('pageInfo') or {}).get('hasNextPage'):
+                return PlatformList(username=username, anime_list=anime_entries)
+            page += 1
+
     def _auth_headers(self) -> Dict[str, str]:
         if not self.access_token:
             raise ValueError("AniList access token missing. Set ANILIST_ACCESS_TOKEN in credentials.env")
         return {"Authorization": f"Bearer {self.access_token}"}
 
     def search_media_id(self, title: str) -> Optional[int]:
+        cached = self.media_ids.get(title)
+        if cached is not None:
+            return cached
         query = '''
         query ($search: String) {
           Media(search: $search, type: ANIME) { id }
@@ -382,7 +681,9 @@ class AniListClient(BaseAPIClient):
         resp.raise_for_status()
         data = resp.json()
         media = (data.get('data') or {}).get('Media')
-        return media.get('id') if media else None
+        media_id = media.get('id') if media else None
+        self.media_ids.set(title, media_id)
+        return media_id
 
     def save_list_entry(self, title: str, status: Optional[str], score: Optional[float], progress: Optional[int]) -> bool:
         """
@@ -412,23 +713,10 @@ class AniListClient(BaseAPIClient):
         if status is None and score is None and progress is None:
             raise ValueError("At least one of status, score, or progress must be provided")
             
-        # Map status to AniList's expected values
-        status_map = {
-            'watching': 'CURRENT',
-            'completed': 'COMPLETED',
-            'on_hold': 'PAUSED',
-            'dropped': 'DROPPED',
-            'plan_to_watch': 'PLANNING',
-            'planning': 'PLANNING',
-            'current': 'CURRENT',
-            'paused': 'PAUSED',
-            'repeating': 'REPEATING'
-        }
-        
         # Prepare variables for the mutation
         variables = {
             "mediaId": media_id,
-            "status": status_map.get(status.lower()) if status else None,
+            "status": self._map_status(status),
             "scoreRaw": float(score) * 10 if isinstance(score, (int, float)) and score is not None else None,
             "progress": int(progress) if isinstance(progress, (int, float)) and progress is not None else None,
         }
@@ -490,15 +778,169 @@ class AniListClient(BaseAPIClient):
             return True
             
         except requests.RequestException as e:
-            error_msg = f"Failed to update AniList entry for '{title}': {str(e)}"
-            if hasattr(e, 'response') and e.response is not None:
-                try:
-                    error_data = e.response.json()
-                    if 'errors' in error_data:
-                        errors = [err.get('message', 'Unknown error') for err in error_data.get('errors', [])]
-                        error_msg += f" - {', '.join(errors)}"
-                    else:
-                        error_msg += f" - {e.response.text}"
-                except:
-                    error_msg += f" - {e.response.text}"
-            raise Exception(error_msg) from e
+            raise EntryUpdateError("AniList", title, e) from e
+
+    def _post_graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Post a GraphQL document and return the decoded body.
+        
+        Partial results are returned as-is so callers can attribute errors per alias.
+        
+        Raises:
+            Exception: On authentication failure or when the response carries no data
+        """
+        headers = self._auth_headers()
+        headers.update({
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        })
+        response = self.session.post(
+            self.base_url,
+            headers=headers,
+            data=orjson.dumps({'query': query, 'variables': variables}),
+            timeout=30
+        )
+        
+        if response.status_code == 401:
+            raise Exception("Authentication failed. Please check your ANILIST_ACCESS_TOKEN")
+        try:
+            result = orjson.loads(response.content)
+        except ValueError:
+            response.raise_for_status()
+            raise Exception("Unexpected response format from AniList API")
+        
+        # AniList answers a partially failed document with a 4xx status but still
+        # returns the aliases that succeeded under "data"
+        if not isinstance(result, dict) or not result.get('data'):
+            response.raise_for_status()
+            errors = [err.get('message', 'Unknown error') for err in (result or {}).get('errors', [])]
+            raise Exception(f"AniList API errors: {', '.join(errors) or 'empty response'}")
+        return result
+
+    @staticmethod
+    def _alias_errors(result: Dict[str, Any]) -> Dict[str, str]:
+        """Group GraphQL error messages by the alias named in their path."""
+        errors: Dict[str, str] = {}
+        for err in result.get('errors') or []:
+            path = err.get('path') or []
+            if path:
+                message = err.get('message', 'Unknown error')
+                errors[path[0]] = f"{errors[path[0]]}, {message}" if path[0] in errors else message
+        return errors
+
+    def search_media_ids(self, titles: List[str], mal_ids: Optional[List[Optional[int]]] = None) -> List[Optional[int]]:
+        """
+        Look up AniList media IDs for several titles in one aliased query.
+        
+        Args:
+            titles: Titles to search for
+            mal_ids: Optional MAL id per title; where given, the media is looked up exactly by idMal
+            
+        Returns:
+            List[Optional[int]]: Media ID per title, or None where nothing matched
+        """
+        if not titles:
+            return []
+        
+        mal_ids = mal_ids or [None] * len(titles)
+        keys = [('mal', mal_id) if mal_id else title for title, mal_id in zip(titles, mal_ids)]
+        found = [self.media_ids.get(key) for key in keys]
+        params, fields, variables = [], [], {}
+        for i, (title, mal_id) in enumerate(zip(titles, mal_ids)):
+            if found[i]:
+                continue
+            if mal_id:
+                params.append(f"$s{i}: Int")
+                fields.append(f"m{i}: Media(idMal: $s{i}, type: ANIME) {{ id }}")
+                variables[f"s{i}"] = mal_id
+            else:
+                params.append(f"$s{i}: String")
+                fields.append(f"m{i}: Media(search: $s{i}, type: ANIME) {{ id }}")
+                variables[f"s{i}"] = title
+        if not fields:
+            return found
+        query = f"query ({', '.join(params)}) {{\n" + "\n".join(fields) + "\n}"
+        
+        data = self._post_graphql(query, variables)['data']
+        for i, key in enumerate(keys):
+            if not found[i]:
+                found[i] = (data.get(f"m{i}") or {}).get('id')
+                self.media_ids.set(key, found[i])
+        return found
+
+    def save_list_entries_batch(self, entries: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Save several anime entries with a single aliased GraphQL mutation.
+        
+        Args:
+            entries: Dicts with title, status, score (0-100) and progress keys, plus optional
+                media_id (skips the lookup) and mal_id (looks the media up by idMal)
+            
+        Returns:
+            List[Optional[str]]: Per-entry error message, or None where the entry was saved
+            
+        Raises:
+            ValueError: If required authentication is missing
+            Exception: If the request as a whole fails
+        """
+        if not self.access_token:
+            raise ValueError("AniList access token is required for write operations. Set ANILIST_ACCESS_TOKEN in credentials.env")
+        if not entries:
+            return []
+        
+        results: List[Optional[str]] = [None] * len(entries)
+        media_ids = [entry.get('media_id') for entry in entries]
+        unknown = [i for i, media_id in enumerate(media_ids) if not media_id]
+        if unknown:
+            found = self.search_media_ids([entries[i]['title'] for i in unknown],
+                                          [entries[i].get('mal_id') for i in unknown])
+            for i, media_id in zip(unknown, found):
+                media_ids[i] = media_id
+        
+        params: List[str] = []
+        fields: List[str] = []
+        variables: Dict[str, Any] = {}
+        for i, (entry, media_id) in enumerate(zip(entries, media_ids)):
+            if not media_id:
+                results[i] = f"AniList media not found for title: {entry['title']}"
+                continue
+            
+            status, score, progress = entry.get('status'), entry.get('score'), entry.get('progress')
+            entry_vars = {
+                f"mediaId{i}": media_id,
+                f"status{i}": self._map_status(status),
+                f"scoreRaw{i}": int(score) if isinstance(score, (int, float)) else None,
+                f"progress{i}": int(progress) if isinstance(progress, (int, float)) else None,
+            }
+            # Remove None values to avoid sending null to the API
+            entry_vars = {k: v for k, v in entry_vars.items() if v is not None}
+            if len(entry_vars) == 1:
+                results[i] = "At least one of status, score, or progress must be provided"
+                continue
+            
+            params.extend([f"$mediaId{i}: Int!", f"$status{i}: MediaListStatus",
+                           f"$scoreRaw{i}: Int", f"$progress{i}: Int"])
+            fields.append(
+                f"e{i}: SaveMediaListEntry(mediaId: $mediaId{i}, status: $status{i}, "
+                f"scoreRaw: $scoreRaw{i}, progress: $progress{i}) {{ id }}"
+            )
+            variables.update(entry_vars)
+        
+        if not fields:
+            return results
+        
+        mutation = f"mutation ({', '.join(params)}) {{\n" + "\n".join(fields) + "\n}"
+        result = self._post_graphql(mutation, variables)
+        data = result['data']
+        errors = self._alias_errors(result)
+        
+        for i in range(len(entries)):
+            if results[i] is not None:
+                continue
+            alias = f"e{i}"
+            if alias in errors:
+                results[i] = f"AniList API errors: {errors[alias]}"
+            elif not data.get(alias):
+                results[i] = "Unexpected response format from AniList API"
+        return results
+
@@ -1,12 +1,33 @@
+from dataclasses import dataclass
+from functools import lru_cache
 from pydantic import BaseModel, Field
+from rapidfuzz import utils
 from typing import List, Dict, Optional, Any
 
-class AnimeEntry(BaseModel):
+@lru_cache(maxsize=16384)
+def normalize_title(title: str) -> str:
+    """Normalize a title for comparison, once per distinct string; the same titles recur on every sync."""
+    if not title:
+        return ""
+    # Lowercases, replaces punctuation with spaces and trims, in C++
+    return utils.default_process(title)
+
+@dataclass(slots=True, frozen=True)
+class AnimeEntry:
+    """A single list entry; a slotted dataclass since lists hold thousands of these."""
     title: str
     status: str
     score: Optional[int]
     episodes_watched: Optional[int]
     total_episodes: Optional[int]
+    updated_at: Optional[int] = None  # Epoch seconds of the platform's last change to the entry
+    mal_id: Optional[int] = None  # MAL anime id; AniList entries get it from the media's idMal
+    anilist_id: Optional[int] = None  # AniList media id, known only for entries read from AniList
+
+    @property
+    def normalized_title(self) -> str:
+        """Title as used to match entries across platforms (memoized, not stored, so it never serializes)."""
+        return normalize_title(self.title)
 
 class JSONAnimeEntry(BaseModel):
     name: str
@@ -21,6 +42,7 @@ class SyncConfig(BaseModel):
     mal_username: str
     anilist_username: str
     target_platform: str
+    max_concurrency: Optional[int] = Field(None, ge=1, le=16, description="Concurrent write requests per platform; None uses the manager's default")
 
 class SyncDifference(BaseModel):
     """Represents the differences between two anime lists."""
@@ -34,7 +56,7 @@ class SyncResult(BaseModel):
     differences: Dict[str, List[AnimeEntry]] = Field(default_factory=dict, description="Differences between platforms")
     success_count: int = Field(0, description="Number of successful sync operations")
     error_count: int = Field(0, description="Number of failed sync operations")
-    errors: List[str] = Field(default_factory=list, description="List of error messages")
+    errors: List[Dict[str, Any]] = Field(default_factory=list, description="Failed entries as {title, platform, error}")
     sync_id: Optional[str] = Field(None, description="Unique identifier for this sync operation")
     timestamp: Optional[str] = Field(None, description="ISO timestamp when the sync completed")
     warnings: List[str] = Field(default_factory=list, description="List of non-critical warnings")
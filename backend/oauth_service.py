@@ -116,7 +116,7 @@ def exchange_code_for_token(platform: str, code: str, code_verifier: str) -> Dic
     else:
         raise ValueError("Invalid platform")
     
-    response = requests.post(token_url, data=data)
+    response = requests.post(token_url, data=data, timeout=30)
     if response.status_code != 200:
         raise HTTPException(status_code=response.status_code, detail=response.text)
     
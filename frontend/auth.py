@@ -8,6 +8,7 @@ import json
 import os
 import base64
 import hashlib
+import http.cookiejar
 
 def _cfg(name: str, default: Optional[str] = None) -> Optional[str]:
     """Read config from Streamlit secrets first, then environment variables."""
@@ -35,6 +36,17 @@ ANILIST_TOKEN_URL = "https://anilist.co/api/v2/oauth/token"
 
 __all__ = ["authenticate_user", "get_auth_status", "require_auth", "handle_auth_callback"]
 
+@st.cache_resource
+def _http() -> requests.Session:
+    """Shared HTTP session so token exchanges and session checks reuse pooled connections.
+
+    The session is shared by every user of this process, so its cookie jar accepts nothing;
+    cookies a user needs are passed per request instead.
+    """
+    session = requests.Session()
+    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
 def get_session_state() -> Dict[str, Any]:
     """Get or initialize the session state."""
     ss = st.session_state
@@ -59,7 +71,7 @@ def check_auth() -> bool:
         auth = st.session_state.get('authenticated', {})
         return bool(auth.get('mal') or auth.get('anilist') or st.session_state.get('mal_access_token') or st.session_state.get('anilist_access_token'))
     try:
-        response = requests.get(f"{API_BASE_URL}/auth/session", cookies=st.session_state.get('cookies', {}))
+        response = _http().get(f"{API_BASE_URL}/auth/session", cookies=st.session_state.get('cookies', {}), timeout=15)
         if response.status_code == 200:
             data = response.json()
             state.update({
@@ -194,7 +206,7 @@ def handle_auth_callback() -> None:
                 "redirect_uri": redirect_uri,
                 "code_verifier": verifier,
             }
-            resp = requests.post(MAL_TOKEN_URL, data=data, timeout=15)
+            resp = _http().post(MAL_TOKEN_URL, data=data, timeout=15)
         else:
             client_id = _cfg("ANILIST_CLIENT_ID")
             client_secret = _cfg("ANILIST_CLIENT_SECRET")
@@ -207,7 +219,7 @@ def handle_auth_callback() -> None:
             }
             if client_secret:
                 data["client_secret"] = client_secret
-            resp = requests.post(ANILIST_TOKEN_URL, data=data, timeout=15)
+            resp = _http().post(ANILIST_TOKEN_URL, data=data, timeout=15)
 
         if resp.status_code != 200:
             st.error(f"Failed to exchange code: {resp.status_code} {resp.text}")
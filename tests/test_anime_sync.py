@@ -0,0 +1,485 @@
+"""Tests for list fetching, comparison and retries in the sync manager."""
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import orjson
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+from backend.anime_sync import AnimeSyncManager, SyncDirection
+from backend.models import AnimeEntry, PlatformList, SyncConfig
+
+
+def make_list(username, *titles):
+    return PlatformList(username=username, anime_list=[AnimeEntry(title=t, status="watching", score=None, episodes_watched=None, total_episodes=None) for t in titles])
+
+
+def test_compare_lists_splits_by_normalized_title():
+    """Test that titles are matched after normalization and each bucket keeps list order."""
+    manager = AnimeSyncManager(MagicMock(), MagicMock())
+    result = manager._compare_lists(
+        make_list("mal", "Cowboy Bebop", "Trigun", "Monster"),
+        make_list("anilist", "Naruto", "cowboy bebop ", "Berserk")
+    )
+    assert [a.title for a in result["intersection"]] == ["Cowboy Bebop"]
+    assert [a.title for a in result["mal_only"]] == ["Trigun", "Monster"]
+    assert [a.title for a in result["anilist_only"]] == ["Naruto", "Berserk"]
+
+
+def test_compare_lists_empty():
+    """Test comparison against an empty list."""
+    manager = AnimeSyncManager(MagicMock(), MagicMock())
+    result = manager._compare_lists(make_list("mal", "Monster"), make_list("anilist"))
+    assert result["intersection"] == []
+    assert [a.title for a in result["mal_only"]] == ["Monster"]
+    assert result["anilist_only"] == []
+
+
+def test_compare_counts_matches_exact_titles():
+    """Test that the count-only preview agrees with the exact-match part of the comparison."""
+    counts = AnimeSyncManager.compare_counts(
+        make_list("mal", "Cowboy Bebop", "Trigun", "Monster"),
+        make_list("anilist", "Naruto", "cowboy bebop ")
+    )
+    assert counts == (1, 2, 1)
+
+
+def test_fetch_list_merges_changes_into_snapshot():
+    """Test that a second fetch asks only for entries changed since the snapshot and merges them."""
+    client = MagicMock()
+    old = AnimeEntry(title="Monster", status="watching", score=None, episodes_watched=3, total_episodes=74, updated_at=100)
+    changed = AnimeEntry(title="Monster", status="watching", score=None, episodes_watched=5, total_episodes=74, updated_at=200)
+    added = AnimeEntry(title="Trigun", status="planning", score=None, episodes_watched=0, total_episodes=26, updated_at=150)
+    client.get_user_list.side_effect = [
+        PlatformList(username="mal", anime_list=[old]),
+        PlatformList(username="mal", anime_list=[changed, added]),
+    ]
+    manager = AnimeSyncManager(client, MagicMock())
+
+    manager.fetch_list("mal")
+    merged = manager.fetch_list("mal")
+
+    client.get_user_list.assert_called_with(None, since=100)
+    assert [(a.title, a.episodes_watched) for a in merged.anime_list] == [("Monster", 5), ("Trigun", 0)]
+
+
+def test_fetch_list_merge_keeps_same_titled_entries_apart():
+    """Test that a delta for one of two same-titled anime replaces only the entry with its id."""
+    def entry(anilist_id, episodes, updated_at):
+        return AnimeEntry(title="Berserk", status="CURRENT", score=None, episodes_watched=episodes,
+                          total_episodes=25, updated_at=updated_at, anilist_id=anilist_id)
+    client = MagicMock()
+    client.get_user_list.side_effect = [
+        PlatformList(username="anilist", anime_list=[entry(33, 25, 100), entry(21560, 3, 200)]),
+        PlatformList(username="anilist", anime_list=[entry(21560, 4, 200)]),
+    ]
+    manager = AnimeSyncManager(MagicMock(), client)
+
+    manager.fetch_list("anilist")
+    merged = manager.fetch_list("anilist")
+
+    client.get_user_list.assert_called_with(None, since=200)
+    assert [(a.anilist_id, a.episodes_watched) for a in merged.anime_list] == [(33, 25), (21560, 4)]
+
+
+def test_compare_lists_fuzzy_matches_spelling_but_not_sequels():
+    """Test that near-identical titles match while differently numbered seasons stay apart."""
+    manager = AnimeSyncManager(MagicMock(), MagicMock())
+    result = manager._compare_lists(
+        make_list("mal", "Fullmetal Alchemist: Brotherhood", "Shingeki no Kyojin Season 2", "Kaguya-sama: Love is War"),
+        make_list("anilist", "Full Metal Alchemist Brotherhood", "Shingeki no Kyojin Season 3", "Kaguya-sama wa Kokurasetai")
+    )
+    assert [a.title for a in result["intersection"]] == ["Fullmetal Alchemist: Brotherhood"]
+    assert [a.title for a in result["mal_only"]] == ["Shingeki no Kyojin Season 2", "Kaguya-sama: Love is War"]
+    assert [a.title for a in result["anilist_only"]] == ["Shingeki no Kyojin Season 3", "Kaguya-sama wa Kokurasetai"]
+
+
+def test_compare_lists_pairs_by_mal_id_before_title():
+    """Test that a shared MAL id pairs renamed entries, and differing ids keep same-titled ones apart."""
+    def entry(title, mal_id):
+        return AnimeEntry(title=title, status="watching", score=None, episodes_watched=None, total_episodes=None, mal_id=mal_id)
+    manager = AnimeSyncManager(MagicMock(), MagicMock())
+    result = manager._compare_lists(
+        PlatformList(username="mal", anime_list=[entry("Attack on Titan", 16498), entry("Fruits Basket", 120)]),
+        PlatformList(username="anilist", anime_list=[entry("Shingeki no Kyojin", 16498), entry("Fruits Basket", 38680)])
+    )
+    assert [a.title for a in result["intersection"]] == ["Attack on Titan"]
+    assert [a.mal_id for a in result["mal_only"]] == [120]
+    assert [a.mal_id for a in result["anilist_only"]] == [38680]
+
+
+def test_sync_updates_matched_entries_that_differ():
+    """Test that entries on both lists are rewritten from the newer side when their progress differs."""
+    def entry(episodes, updated_at, status="watching"):
+        return AnimeEntry(title="Monster", status=status, score=8, episodes_watched=episodes,
+                          total_episodes=74, updated_at=updated_at, mal_id=19)
+    mal_client, anilist_client = MagicMock(), MagicMock()
+    mal_client.get_user_list.return_value = PlatformList(username="mal", anime_list=[entry(10, 200)])
+    anilist_client.get_user_list.return_value = PlatformList(username="anilist", anime_list=[entry(5, 100, "CURRENT")])
+    anilist_client.save_list_entries_batch.side_effect = lambda batch: [None] * len(batch)
+    manager = AnimeSyncManager(mal_client, anilist_client)
+    config = SyncConfig(mal_username="mal", anilist_username="anilist", target_platform="AniList")
+
+    result = manager.sync(config)
+
+    [payload] = anilist_client.save_list_entries_batch.call_args[0]
+    assert [(e["progress"], e["mal_id"]) for e in payload] == [(10, 19)]
+    mal_client.save_list_entry.assert_not_called()
+    assert result.success_count == 1
+    assert manager._compare_lists(
+        PlatformList(username="mal", anime_list=[entry(5, 200)]),
+        PlatformList(username="anilist", anime_list=[entry(5, 100, "CURRENT")])
+    )["changed"] == []
+
+
+def test_compare_lists_fuzzy_matches_reordered_words():
+    """Test that the same words in a different order count as the same anime."""
+    manager = AnimeSyncManager(MagicMock(), MagicMock())
+    result = manager._compare_lists(
+        make_list("mal", "Shingeki no Kyojin Season 2"),
+        make_list("anilist", "Season 2: Shingeki no Kyojin")
+    )
+    assert [a.title for a in result["intersection"]] == ["Shingeki no Kyojin Season 2"]
+    assert result["mal_only"] == [] and result["anilist_only"] == []
+
+
+def test_sync_skips_unchanged_lists_after_nothing_to_write():
+    """Test that a repeat sync of identical, already-synced lists does no comparison or writes."""
+    mal_client, anilist_client = MagicMock(), MagicMock()
+    mal_client.get_user_list.return_value = make_list("mal", "Monster")
+    anilist_client.get_user_list.return_value = make_list("anilist", "Monster")
+    manager = AnimeSyncManager(mal_client, anilist_client)
+    config = SyncConfig(mal_username="mal", anilist_username="anilist", target_platform="AniList")
+
+    manager.sync(config)
+    with patch.object(manager, "_compare_lists") as compare:
+        result = manager.sync(config)
+
+    compare.assert_not_called()
+    assert result.success_count == 0
+    assert [a.title for a in result.intersection] == ["Monster"]
+
+
+def test_sync_writes_both_directions_concurrently():
+    """Test that MAL and AniList writes overlap while progress is reported on the calling thread."""
+    mal_client, anilist_client = MagicMock(), MagicMock()
+    mal_client.get_user_list.return_value = make_list("mal", "Monster")
+    anilist_client.get_user_list.return_value = make_list("anilist", "Trigun")
+    anilist_started = threading.Event()
+    anilist_client.save_list_entries_batch.side_effect = lambda batch: anilist_started.set() or [None] * len(batch)
+    # The MAL write only succeeds if the AniList write started while it was in flight
+    mal_client.save_list_entry.side_effect = lambda **kwargs: anilist_started.wait(5) or 1 / 0
+    manager = AnimeSyncManager(mal_client, anilist_client)
+    manager.max_retries = 1
+    caller = threading.current_thread()
+    progress_threads = []
+    config = SyncConfig(mal_username="mal", anilist_username="anilist", target_platform="AniList")
+
+    result = manager.sync(config, progress_callback=lambda *args: progress_threads.append(threading.current_thread()))
+
+    assert result.success_count == 2
+    assert progress_threads and set(progress_threads) == {caller}
+
+
+def test_one_way_sync_fetches_both_lists():
+    """Test that a MAL to AniList sync reads the MAL source list as well as the AniList target."""
+    mal_client, anilist_client = MagicMock(), MagicMock()
+    mal_client.get_user_list.return_value = make_list("mal", "Monster")
+    anilist_client.get_user_list.return_value = make_list("anilist")
+    anilist_client.save_list_entries_batch.side_effect = lambda batch: [None] * len(batch)
+    manager = AnimeSyncManager(mal_client, anilist_client)
+    config = SyncConfig(mal_username="mal", anilist_username="anilist", target_platform="AniList")
+
+    result = manager.sync(config, SyncDirection.MAL_TO_ANILIST)
+
+    assert result.success_count == 1
+    mal_client.save_list_entry.assert_not_called()
+
+
+def http_error(status, headers=None):
+    response = MagicMock(status_code=status, headers=headers or {})
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+def test_run_with_retries_retries_transient_errors_only():
+    """Test that 5xx responses are retried while other 4xx responses fail at once."""
+    manager = AnimeSyncManager(MagicMock(), MagicMock())
+    manager.retry_delay = 0
+
+    flaky = MagicMock(side_effect=[http_error(503), "ok"])
+    assert manager._run_with_retries("flaky", flaky) == "ok"
+    assert flaky.call_count == 2
+
+    missing = MagicMock(side_effect=http_error(404))
+    with pytest.raises(requests.HTTPError):
+        manager._run_with_retries("missing", missing)
+    assert missing.call_count == 1
+
+
+def test_sync_entry_reports_structured_error():
+    """Test that a failed write is reported as a title/platform/error dict."""
+    manager = AnimeSyncManager(MagicMock(), MagicMock())
+    entry = make_list("mal", "Monster").anime_list[0]
+    error = manager._sync_entry("MAL", MagicMock(side_effect=http_error(404)), entry)
+    assert error == {"title": "Monster", "platform": "MAL", "error": "404 error"}
+
+
+def test_anilist_batch_splits_rejected_document():
+    """Test that a batch AniList rejects as a whole is split so only the bad entry fails."""
+    manager = AnimeSyncManager(MagicMock(), MagicMock())
+
+    def save(payload):
+        if any(entry["title"] == "Bad" for entry in payload):
+            raise http_error(400)
+        return [None] * len(payload)
+
+    manager.anilist_client.save_list_entries_batch.side_effect = save
+    errors = manager._sync_anilist_batch(make_list("mal", "Monster", "Bad", "Trigun", "Berserk").anime_list)
+
+    assert [error and error["title"] for error in errors] == [None, "Bad", None, None]
+
+
+def test_sync_entries_skips_entries_that_cannot_succeed():
+    """Test that entries with nothing to look up or write fail without a request."""
+    manager = AnimeSyncManager(MagicMock(), MagicMock())
+    save = MagicMock(side_effect=lambda batch: [None] * len(batch))
+    entries = [
+        AnimeEntry(title="Monster", status="watching", score=None, episodes_watched=None, total_episodes=None),
+        AnimeEntry(title=" ", status="watching", score=None, episodes_watched=None, total_episodes=None),
+        AnimeEntry(title="Trigun", status="", score=None, episodes_watched=None, total_episodes=None),
+    ]
+
+    result = manager._sync_entries("MAL", save, entries)
+
+    save.assert_called_once_with(entries[:1])
+    assert result["success"] == 1
+    assert [error["title"] for error in result["errors"]] == [" ", "Trigun"]
+
+
+def test_retry_after_prefers_server_header():
+    """Test that a 503's Retry-After sets the wait, padded by at most half."""
+    manager = AnimeSyncManager(MagicMock(), MagicMock())
+    assert manager._retry_after(Exception("no response")) is None
+    error = Exception("wrapped")
+    error.__cause__ = http_error(503, {"Retry-After": "4"})
+    assert 4 <= manager._retry_after(error) <= 6
+
+
+@pytest.fixture
+def http_server():
+    """Serve canned (status, headers) responses in order on localhost, recording each request's method."""
+    responses, methods = [], []
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self):
+            methods.append(self.command)
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            status, headers = responses.pop(0) if responses else (200, {})
+            self.send_response(status)
+            for name, value in {"Content-Length": "2", **headers}.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        do_GET = do_PUT = do_POST = _reply
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/", responses, methods
+    server.shutdown()
+    server.server_close()
+
+
+def test_adapter_leaves_429_to_the_rate_limited_session(http_server):
+    """Test that a 429 with Retry-After passes through the real adapter and drains the shared bucket."""
+    from backend.api_clients import AniListClient, RateLimitedSession, TokenBucket
+    url, responses, methods = http_server
+    responses.append((429, {"Retry-After": "1"}))
+    limiter = MagicMock(wraps=TokenBucket(100))
+    session = RateLimitedSession(limiter)
+    session.mount("http://", AniListClient._shared_adapter())
+
+    assert session.put(url).status_code == 200
+
+    assert methods == ["PUT", "PUT"]
+    limiter.observe.assert_any_call(None, 1.0)
+
+
+def test_mal_write_5xx_is_retried_once_by_the_manager(http_server):
+    """Test that a MAL PUT's 503 passes through the adapter untouched, so only the manager retries it."""
+    with patch.dict("os.environ", {"MAL_CLIENT_ID": "id"}):
+        from backend.api_clients import EntryUpdateError, MALClient
+        client = MALClient("token")
+    url, responses, methods = http_server
+    client.base_url = url.rstrip("/")
+    responses.extend([(503, {}), (503, {}), (503, {})])
+    manager = AnimeSyncManager(client, MagicMock())
+    manager.retry_delay = 0
+
+    with pytest.raises(EntryUpdateError) as excinfo:
+        manager._run_with_retries("Monster", lambda: client.save_list_entry("Monster", "watching", None, 3, anime_id=19))
+
+    assert methods == ["PUT"] * manager.max_retries
+    assert excinfo.value.__cause__.response.status_code == 503
+
+
+def test_session_resends_after_429_and_gives_up_when_bounded():
+    """Test that a 429 is re-sent after its Retry-After, a bounded number of times."""
+    from backend.api_clients import RATE_LIMIT_RETRIES, RateLimitedSession
+    throttled = MagicMock(status_code=429, headers={"Retry-After": "2"})
+    ok = MagicMock(status_code=200, headers={})
+    session = RateLimitedSession()
+    with patch("requests.Session.request", side_effect=[throttled, ok]), patch("time.sleep") as sleep:
+        assert session.request("GET", "https://x") is ok
+    sleep.assert_called_once_with(2.0)
+
+    with patch("requests.Session.request", return_value=throttled) as send, patch("time.sleep"):
+        assert session.request("GET", "https://x") is throttled
+    assert send.call_count == RATE_LIMIT_RETRIES + 1
+
+
+def test_persistent_429_is_not_retried_again_by_the_manager():
+    """Test that a write throttled on every attempt costs RATE_LIMIT_RETRIES + 1 requests in total."""
+    from backend.api_clients import RATE_LIMIT_RETRIES, RateLimitedSession
+    manager = AnimeSyncManager(MagicMock(), MagicMock())
+    manager.retry_delay = 0
+    throttled = MagicMock(status_code=429, headers={"Retry-After": "1"})
+    throttled.raise_for_status.side_effect = requests.HTTPError("429 error", response=throttled)
+    session = RateLimitedSession()
+
+    with patch("requests.Session.request", return_value=throttled) as send, patch("time.sleep"):
+        with pytest.raises(requests.HTTPError):
+            manager._run_with_retries("throttled", lambda: session.request("PUT", "https://x").raise_for_status())
+    assert send.call_count == RATE_LIMIT_RETRIES + 1
+
+
+def test_mal_list_reuses_unchanged_page_on_304():
+    """Test that a full MAL list fetch revalidates with its ETag and reuses the page on 304."""
+    with patch.dict("os.environ", {"MAL_CLIENT_ID": "id"}):
+        from backend.api_clients import MALClient
+        client = MALClient("token")
+    page = {"data": [{"node": {"title": "Monster", "num_episodes": 74}, "list_status": {"status": "watching"}}], "paging": {}}
+    client.session = MagicMock()
+    client.session.get.side_effect = [
+        MagicMock(status_code=200, headers={"ETag": '"v1"'}, content=orjson.dumps(page)),
+        MagicMock(status_code=304, headers={}),
+    ]
+
+    first = client.get_user_list("user")
+    second = client.get_user_list("user")
+
+    assert client.session.get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert [entry.title for entry in second.anime_list] == [entry.title for entry in first.anime_list] == ["Monster"]
+
+
+def test_anilist_unchanged_body_reuses_entries_in_a_new_list():
+    """Test that an identical AniList body skips parsing but never hands out the same list twice."""
+    from backend.api_clients import AniListClient
+    client = AniListClient("token")
+    body = {"data": {"MediaListCollection": {"lists": [{"entries": [{"status": "CURRENT", "media": {"id": 1, "title": {"romaji": "Monster"}}}]}]}}}
+    client.session = MagicMock()
+    client.session.post.return_value = MagicMock(status_code=200, content=orjson.dumps(body))
+
+    first = client.get_user_list("user")
+    first.anime_list.clear()
+    with patch("backend.api_clients.orjson.loads") as loads:
+        second = client.get_user_list("user")
+
+    loads.assert_not_called()
+    assert [entry.title for entry in second.anime_list] == ["Monster"]
+
+
+def test_mal_list_fetches_later_pages_by_offset():
+    """Test that a multi-page MAL list is read by offset, in order, stopping at the last page."""
+    with patch.dict("os.environ", {"MAL_CLIENT_ID": "id"}):
+        from backend.api_clients import MALClient
+        client = MALClient("token")
+    titles = {0: "Monster", 1000: "Trigun", 2000: "Berserk"}
+
+    def get(url, params=None, headers=None):
+        offset = params.get("offset", 0)
+        data = [{"node": {"title": titles[offset]}, "list_status": {}}] if offset in titles else []
+        paging = {"next": "more"} if offset < 2000 else {}
+        return MagicMock(status_code=200, headers={}, content=orjson.dumps({"data": data, "paging": paging}))
+
+    client.session = MagicMock()
+    client.session.get.side_effect = get
+
+    assert [entry.title for entry in client.get_user_list("user").anime_list] == ["Monster", "Trigun", "Berserk"]
+    # MAL sent no ETag, so nothing was kept for revalidation
+    assert len(client._list_pages) == 0
+
+
+def test_mal_list_requests_no_page_past_a_second_last_page():
+    """Test that a two-page MAL list is read without speculative requests past its end."""
+    with patch.dict("os.environ", {"MAL_CLIENT_ID": "id"}):
+        from backend.api_clients import MALClient
+        client = MALClient("token")
+
+    def get(url, params=None, headers=None):
+        paging = {"next": "more"} if params.get("offset", 0) == 0 else {}
+        return MagicMock(status_code=200, headers={}, content=orjson.dumps({"data": [], "paging": paging}))
+
+    client.session = MagicMock()
+    client.session.get.side_effect = get
+    client.get_user_list("user")
+
+    assert [call.kwargs["params"].get("offset", 0) for call in client.session.get.call_args_list] == [0, 1000]
+
+
+def test_media_id_lookups_are_cached_across_clients():
+    """Test that titles already resolved by any AniList client are not searched again."""
+    from backend.api_clients import AniListClient
+    first, second = AniListClient("token"), AniListClient("token")
+    first._post_graphql = MagicMock(return_value={"data": {"m0": {"id": 1}, "m1": None}})
+    second._post_graphql = MagicMock(return_value={"data": {"m1": {"id": 2}}})
+
+    assert first.search_media_ids(["Cache Test A", "Cache Test B"]) == [1, None]
+    assert second.search_media_ids([" cache test a", "Cache Test B"]) == [1, 2]
+    assert second._post_graphql.call_args.args[1] == {"s1": "Cache Test B"}
+
+
+def test_clients_share_connection_pool_per_platform():
+    """Test that clients rebuilt for a new token reuse their platform's keep-alive pool."""
+    from backend.api_clients import AniListClient
+    with patch.dict("os.environ", {"MAL_CLIENT_ID": "id"}):
+        from backend.api_clients import MALClient
+        first, second = MALClient("old"), MALClient("new")
+    anilist = AniListClient("token")
+
+    assert first.session.get_adapter("https://x") is second.session.get_adapter("https://x")
+    assert anilist.session.get_adapter("https://x") is not first.session.get_adapter("https://x")
+
+
+def test_sync_from_json_drops_invalid_entries_and_coerces_numbers():
+    """Test that imported entries are validated together, keeping the valid ones."""
+    manager = AnimeSyncManager(MagicMock(), MagicMock())
+    manager.anilist_batch_size = 10
+    manager.anilist_client.save_list_entries_batch.side_effect = lambda batch: [None] * len(batch)
+    config = SyncConfig(mal_username="mal", anilist_username="anilist", target_platform="AniList")
+
+    result = manager.sync_from_json([
+        {"name": "Monster", "mal": "", "al": ""},
+        {"title": "Trigun", "score": "8"},
+        {"title": "Berserk", "score": "not a number"},
+        {"unknown": "shape"},
+    ], config)
+
+    entries = result.differences["json_entries"]
+    assert [(e.title, e.score) for e in entries] == [("Monster", None), ("Trigun", 8)]
+    assert result.success_count == 2
+
+
+def test_sync_from_json_accepts_bytes_and_files():
+    """Test that raw JSON bytes and binary files import the same entries as parsed lists."""
+    manager = AnimeSyncManager(MagicMock(), MagicMock())
+    manager.anilist_client.save_list_entries_batch.side_effect = lambda batch: [None] * len(batch)
+    config = SyncConfig(mal_username="mal", anilist_username="anilist", target_platform="AniList")
+    raw = b'[{"title": "Monster", "score": 9}, {"name": "Trigun", "mal": "", "al": ""}]'
+
+    for source in (raw, io.BytesIO(raw)):
+        result = manager.sync_from_json(source, config)
+        assert [e.title for e in result.differences["json_entries"]] == ["Monster", "Trigun"]